@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _me_key(user_id):
+    return f'accounts:me:{user_id}'
+
+
+def get_cached_me(user_id):
+    """Cached /api/auth/me payload, or None when missing or caching is disabled"""
+    if not settings.AUTH_ME_CACHE_TIMEOUT:
+        return None
+    return cache.get(_me_key(user_id))
+
+
+def cache_me(user_id, data):
+    if settings.AUTH_ME_CACHE_TIMEOUT:
+        cache.set(_me_key(user_id), dict(data), settings.AUTH_ME_CACHE_TIMEOUT)
+
+
+def invalidate_me(*user_ids):
+    cache.delete_many([_me_key(user_id) for user_id in user_ids])
@@ -84,10 +84,13 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'email', 'createdAt']
     
     def _get_profile(self, obj):
-        """Helper to get or create profile"""
+        """Helper to get or create profile; cached on the user after the first call"""
         from profiles.models import Profile
-        profile, _ = Profile.objects.get_or_create(user=obj)
-        return profile
+        try:
+            return obj.profile
+        except Profile.DoesNotExist:
+            obj.profile, _ = Profile.objects.get_or_create(user=obj)
+            return obj.profile
     
     def get_name(self, obj):
         profile = self._get_profile(obj)
@@ -117,32 +120,24 @@ class UserSerializer(serializers.ModelSerializer):
         profile = self._get_profile(obj)
         return profile.skills
     
+    def to_representation(self, instance):
+        # Graph looked up once for connections, followers and following
+        from connections.services import ConnectionGraph
+        self._graph = ConnectionGraph.get(instance.id)
+        return super().to_representation(instance)
+    
     def get_connections(self, obj):
         """Returns array of connection user IDs"""
-        from connections.models import ConnectionRequest
-        sent = ConnectionRequest.objects.filter(
-            sender=obj, status='accepted'
-        ).values_list('receiver_id', flat=True)
-        received = ConnectionRequest.objects.filter(
-            receiver=obj, status='accepted'
-        ).values_list('sender_id', flat=True)
-        return list(set(list(sent) + list(received)))
+        from connections.services import ConnectionGraph
+        return ConnectionGraph.connections(self._graph)
     
     def get_followers(self, obj):
         """Returns array of follower user IDs"""
-        from connections.models import ConnectionRequest
-        followers = ConnectionRequest.objects.filter(
-            receiver=obj, status='accepted'
-        ).values_list('sender_id', flat=True)
-        return list(followers)
+        return list(self._graph['followers'])
     
     def get_following(self, obj):
         """Returns array of following user IDs"""
-        from connections.models import ConnectionRequest
-        following = ConnectionRequest.objects.filter(
-            sender=obj, status='accepted'
-        ).values_list('receiver_id', flat=True)
-        return list(following)
+        return list(self._graph['following'])
 
 
 # Custom JWT Serializer to accept email instead of username
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from profiles.models import Profile
+from connections.models import ConnectionRequest
+from .cache import invalidate_me
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_me_on_profile_change(sender, instance, **kwargs):
+    # Saving the user saves its profile too, so this covers account edits
+    invalidate_me(instance.user_id)
+
+
+@receiver(post_save, sender=ConnectionRequest)
+@receiver(post_delete, sender=ConnectionRequest)
+def invalidate_me_on_connection_change(sender, instance, **kwargs):
+    invalidate_me(instance.sender_id, instance.receiver_id)
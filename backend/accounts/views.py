@@ -4,6 +4,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import UserRegistrationSerializer, UserSerializer
+from .cache import get_cached_me, cache_me
 
 
 @api_view(['POST'])
@@ -25,8 +26,11 @@ def register(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def me(request):
-    serializer = UserSerializer(request.user)
-    return Response(serializer.data)
+    data = get_cached_me(request.user.id)
+    if data is None:
+        data = UserSerializer(request.user).data
+        cache_me(request.user.id, data)
+    return Response(data)
 
 
 # Custom JWT View to use email-based authentication
@@ -0,0 +1,92 @@
+"""
+Cached chat authorization.
+
+Room membership is kept in an in-process LRU, optionally backed by the
+shared Django cache so other workers can skip the query too. Whether the
+two members may chat comes from the cached connection graph, which is
+invalidated whenever a connection request changes. Membership is only
+invalidated in the process that changes it (and in the shared cache);
+rooms gain members when they are created and otherwise only change from
+the admin.
+"""
+from django.conf import settings
+from connectx_backend.cache import LocalLRUBackend, DjangoCacheBackend
+from connections.services import ConnectionGraph
+from .models import ChatRoom
+
+DEFAULT_CHAT_ACCESS_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'SHARED': False,
+    'TIMEOUT': 3600,
+    'CACHE_ALIAS': 'default',
+}
+
+
+class RoomAccess:
+    def __init__(self, local, shared=None):
+        self.local = local
+        self.shared = shared
+    
+    @staticmethod
+    def _key(room_id):
+        return f'chat:members:{room_id}'
+    
+    def members(self, room_id):
+        """Sorted tuple of the room's user ids (empty if the room does not exist)"""
+        key = self._key(room_id)
+        members = self.local.get(key)
+        if members is None and self.shared is not None:
+            members = self.shared.get(key)
+            if members is not None:
+                self.local.set(key, members)
+        
+        if members is None:
+            members = tuple(sorted(ChatRoom.users.through.objects.filter(
+                chatroom_id=room_id
+            ).values_list('user_id', flat=True)))
+            # Rooms are created before their users are added; don't cache that gap
+            if members:
+                self.local.set(key, members)
+                if self.shared is not None:
+                    self.shared.set(key, members)
+        
+        return members
+    
+    def invalidate(self, room_id):
+        key = self._key(room_id)
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+    
+    def authorize(self, room_id, user_id):
+        """
+        Returns the other member's user id if user_id may chat in the room
+        (is a member and has an accepted connection with them), else None.
+        """
+        members = self.members(room_id)
+        if user_id not in members:
+            return None
+        
+        others = [member for member in members if member != user_id]
+        if not others:
+            return None
+        
+        other_user_id = others[0]
+        if not ConnectionGraph.is_connected(user_id, other_user_id):
+            return None
+        return other_user_id
+
+
+_room_access = None
+
+
+def get_room_access():
+    """Process-wide RoomAccess configured from settings.CHAT_ACCESS_CACHE"""
+    global _room_access
+    
+    if _room_access is None:
+        options = {**DEFAULT_CHAT_ACCESS_CACHE, **getattr(settings, 'CHAT_ACCESS_CACHE', {})}
+        shared = DjangoCacheBackend(options['CACHE_ALIAS'], options['TIMEOUT']) if options['SHARED'] else None
+        _room_access = RoomAccess(LocalLRUBackend(options['MAX_ENTRIES']), shared)
+    
+    return _room_access
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ChatRoom, Message
+from .models import ChatRoom, Message, ChatReadState
 
 
 class MessageInline(admin.TabularInline):
@@ -31,3 +31,10 @@ class MessageAdmin(admin.ModelAdmin):
     def content_preview(self, obj):
         return obj.content[:50]
     content_preview.short_description = 'Content'
+
+
+@admin.register(ChatReadState)
+class ChatReadStateAdmin(admin.ModelAdmin):
+    list_display = ['id', 'room', 'user', 'unread_count', 'last_read_at']
+    search_fields = ['user__email']
+    readonly_fields = ['last_read_at']
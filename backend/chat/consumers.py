@@ -1,14 +1,90 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from .models import ChatRoom, Message
-from connections.models import ConnectionRequest
+from .models import Message
+from .access import get_room_access
+from .writer import get_message_writer, write_behind_options, save_message
+from .notifications import user_group, encode_event, send_to_users, send_unread_updates
+from .services import UnreadService
+from profiles.presence import PresenceService
 
 User = get_user_model()
 
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatSocketMixin:
+    """Presence, sender data and message sending shared by the chat sockets"""
+    
+    async def start_session(self):
+        # Resolved once; every message from this socket carries it
+        self.sender_name = await self.get_sender_name()
+    
+    async def track_presence(self):
+        await sync_to_async(PresenceService.connect)(self.user.id)
+        self.tracks_presence = True
+    
+    async def end_session(self):
+        # Don't leave this socket's messages waiting for the batch timer
+        if write_behind_options()['ENABLED']:
+            await get_message_writer().flush()
+        
+        if getattr(self, 'tracks_presence', False):
+            await sync_to_async(PresenceService.disconnect)(self.user.id)
+    
+    async def heartbeat(self):
+        await sync_to_async(PresenceService.heartbeat)(self.user.id)
+    
+    async def send_chat_message(self, room_id, other_user_id, content):
+        """
+        Save a message from this socket's user and deliver it to the room's
+        sockets and to both members' notification sockets, followed by the
+        recipient's new unread count
+        """
+        write_behind = write_behind_options()['ENABLED']
+        if write_behind:
+            # Broadcast now, persist with the next batch (id is assigned then)
+            message = Message(room_id=room_id, sender=self.user, content=content)
+        else:
+            # Save message to database
+            message = await self.save_message(room_id, content)
+        
+        data = {
+            'uid': str(message.uid),
+            'room_id': room_id,
+            'sender_id': self.user.id,
+            'sender_name': self.sender_name,
+            'content': message.content,
+            'timestamp': message.timestamp.isoformat(),
+        }
+        # Unsaved messages have no id yet; clients key on uid
+        if not write_behind:
+            data['id'] = message.id
+        
+        # Encoded once for all recipients
+        text = encode_event('message', data)
+        
+        await self.channel_layer.group_send(f'chat_{room_id}', {'type': 'chat_message', 'text': text})
+        await send_to_users(self.channel_layer, [self.user.id, other_user_id], text)
+        
+        if write_behind:
+            # Unread counts are sent once the batch is saved
+            await get_message_writer().add(message)
+        else:
+            updates = await database_sync_to_async(UnreadService.unread_updates)([(room_id, self.user.id)])
+            await send_unread_updates(self.channel_layer, updates)
+    
+    @database_sync_to_async
+    def get_sender_name(self):
+        return self.user.profile.full_name
+    
+    @database_sync_to_async
+    def save_message(self, room_id, content):
+        """Save message to database (access was checked before)"""
+        return save_message(room_id, self.user, content)
+
+
+class ChatConsumer(ChatSocketMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.room_id = self.scope['url_route']['kwargs']['room_id']
         self.room_group_name = f'chat_{self.room_id}'
@@ -25,6 +101,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
+        await self.start_session()
+        
         # Join room group
         await self.channel_layer.group_add(
             self.room_group_name,
@@ -32,8 +110,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
         )
         
         await self.accept()
+        
+        await self.track_presence()
     
     async def disconnect(self, close_code):
+        await self.end_session()
+        
         # Leave room group
         if hasattr(self, 'room_group_name'):
             await self.channel_layer.group_discard(
@@ -43,75 +125,102 @@ class ChatConsumer(AsyncWebsocketConsumer):
     
     async def receive(self, text_data):
         data = json.loads(text_data)
+        
+        # Clients send {"type": "heartbeat"} periodically to stay online
+        if data.get('type') == 'heartbeat':
+            await self.heartbeat()
+            return
+        
         message_content = data.get('message', '')
         
         if not message_content:
             return
         
-        # Save message to database
-        message = await self.save_message(message_content)
-        
-        # Send message to room group
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'chat_message',
-                'message': {
-                    'id': message.id,
-                    'sender_id': message.sender.id,
-                    'sender_name': message.sender.profile.full_name,
-                    'content': message.content,
-                    'timestamp': message.timestamp.isoformat(),
-                }
-            }
-        )
+        await self.send_chat_message(int(self.room_id), self.other_user_id, message_content)
     
     async def chat_message(self, event):
-        # Send message to WebSocket
-        await self.send(text_data=json.dumps({
-            'type': 'message',
-            'data': event['message']
-        }))
+        # Forward the pre-encoded message to the WebSocket as is
+        await self.send(text_data=event['text'])
     
     @database_sync_to_async
     def check_room_access(self):
-        """Check if user has access to this chat room (must be connected)"""
-        try:
-            room = ChatRoom.objects.get(id=self.room_id)
-            
-            # Check if user is part of the room
-            if not room.users.filter(id=self.user.id).exists():
-                return False
-            
-            # Get the other user in the room
-            other_user = room.users.exclude(id=self.user.id).first()
-            
-            if not other_user:
-                return False
-            
-            # Check if they have an accepted connection
-            connection_exists = ConnectionRequest.objects.filter(
-                sender__in=[self.user, other_user],
-                receiver__in=[self.user, other_user],
-                status='accepted'
-            ).exists()
-            
-            return connection_exists
-            
-        except ChatRoom.DoesNotExist:
-            return False
+        """
+        Check if user has access to this chat room (must be connected).
+        Remembers the other member for the lifetime of the socket.
+        """
+        self.other_user_id = get_room_access().authorize(int(self.room_id), self.user.id)
+        return self.other_user_id is not None
+
+
+class UserConsumer(ChatSocketMixin, AsyncWebsocketConsumer):
+    """
+    One socket per user (ws/notifications/) carrying all of their rooms and
+    notifications, instead of one ChatConsumer socket per room.
     
-    @database_sync_to_async
-    def save_message(self, content):
-        """Save message to database"""
-        room = ChatRoom.objects.get(id=self.room_id)
-        message = Message.objects.create(
-            room=room,
-            sender=self.user,
-            content=content
-        )
+    Receives {"type": "message", "room_id": ..., "message": "..."} and
+    {"type": "heartbeat"}; sends the events described in chat.notifications.
+    """
+    
+    async def connect(self):
+        self.user = self.scope['user']
+        
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+        
+        # room_id -> other member, for rooms the user may send to
+        self.rooms = {}
+        self.group_name = user_group(self.user.id)
+        
+        await self.start_session()
+        
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
         
-        # Update room's updated_at timestamp
-        room.save()
+        await self.accept()
+        
+        await self.track_presence()
+    
+    async def disconnect(self, close_code):
+        await self.end_session()
+        
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+    
+    async def receive(self, text_data):
+        data = json.loads(text_data)
         
-        return message
+        if data.get('type') == 'heartbeat':
+            await self.heartbeat()
+            return
+        
+        if data.get('type') != 'message':
+            return
+        
+        message_content = data.get('message', '')
+        try:
+            room_id = int(data.get('room_id'))
+        except (TypeError, ValueError):
+            return
+        
+        if not message_content:
+            return
+        
+        other_user_id = await self.authorize_room(room_id)
+        if other_user_id is None:
+            await self.send(text_data=encode_event('error', {'room_id': room_id, 'error': 'Access denied'}))
+            return
+        
+        await self.send_chat_message(room_id, other_user_id, message_content)
+    
+    async def user_event(self, event):
+        # Forward the pre-encoded event to the WebSocket as is
+        await self.send(text_data=event['text'])
+    
+    async def authorize_room(self, room_id):
+        """Other member of the room if the user may send there; granted access is kept for the socket"""
+        if room_id not in self.rooms:
+            other_user_id = await database_sync_to_async(get_room_access().authorize)(room_id, self.user.id)
+            if other_user_id is None:
+                return None
+            self.rooms[room_id] = other_user_id
+        return self.rooms[room_id]
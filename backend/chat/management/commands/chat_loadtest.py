@@ -0,0 +1,185 @@
+import json
+import time
+import uuid
+from importlib import import_module
+from urllib.parse import urlparse
+from autobahn.twisted.websocket import WebSocketClientProtocol, WebSocketClientFactory, connectWS
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from twisted.internet import defer, reactor, task
+from twisted.python.failure import Failure
+from chat.models import ChatRoom
+
+
+class LoadTestClient(WebSocketClientProtocol):
+    def onOpen(self):
+        self.factory.run.opened.append(self)
+    
+    def onMessage(self, payload, is_binary):
+        received = time.perf_counter()
+        content = json.loads(payload)['data']['content']
+        if content.startswith(self.factory.run.prefix):
+            sent = float(content.rsplit(':', 1)[1])
+            self.factory.run.latencies.append((received - sent) * 1000)
+    
+    def onClose(self, was_clean, code, reason):
+        if not was_clean and self.factory.run.accepting:
+            self.factory.run.errors.append(f'closed: {code} {reason}')
+
+
+class LoadTestClientFactory(WebSocketClientFactory):
+    protocol = LoadTestClient
+    
+    def __init__(self, run, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.run = run
+    
+    def clientConnectionFailed(self, connector, reason):
+        self.run.errors.append(f'connect failed: {reason.getErrorMessage()}')
+
+
+class LoadTestRun:
+    def __init__(self):
+        self.prefix = f'loadtest:{uuid.uuid4().hex[:8]}:'
+        self.opened = []
+        self.latencies = []
+        self.errors = []
+        self.sent = 0
+        self.accepting = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Open N authenticated WebSocket clients on ws/chat/<room_id>/ of a running server, '
+        'send at a fixed total rate and report fan-out latency and throughput. '
+        'Clients log in as the room members; messages are saved like real chat, '
+        'so point it at a test room.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('room_id', type=int)
+        parser.add_argument('--url', default='ws://localhost:8000', help='Server base URL (ws:// or wss://)')
+        parser.add_argument('--origin', default=None, help='Origin header; defaults to the server URL')
+        parser.add_argument('--clients', type=int, default=10)
+        parser.add_argument('--rate', type=float, default=20.0, help='Messages per second, across all clients')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to send for')
+    
+    def handle(self, *args, **options):
+        try:
+            room = ChatRoom.objects.get(id=options['room_id'])
+        except ChatRoom.DoesNotExist:
+            raise CommandError(f"Room {options['room_id']} does not exist")
+        
+        members = list(room.users.all())
+        if not members:
+            raise CommandError('Room has no members')
+        
+        sessions = [self.create_session(user) for user in members]
+        try:
+            run = self.run_on_reactor(self.run(room, sessions, options))
+        finally:
+            for session in sessions:
+                session.delete()
+        
+        self.report(run, options)
+    
+    def create_session(self, user):
+        """Logged-in session for user, as AuthMiddlewareStack expects from the cookie"""
+        engine = import_module(settings.SESSION_ENGINE)
+        session = engine.SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return session
+    
+    def run_on_reactor(self, coroutine):
+        """
+        Runs the client coroutine on the Twisted reactor. Daphne installs the
+        asyncio reactor at startup, so autobahn's Twisted client is the one
+        available here.
+        """
+        outcome = []
+        
+        def start():
+            deferred = defer.Deferred.fromCoroutine(coroutine)
+            deferred.addBoth(lambda result: (outcome.append(result), reactor.stop()))
+        
+        reactor.callWhenRunning(start)
+        reactor.run(installSignalHandlers=False)
+        
+        if isinstance(outcome[0], Failure):
+            outcome[0].raiseException()
+        return outcome[0]
+    
+    async def run(self, room, sessions, options):
+        run = LoadTestRun()
+        url = f"{options['url'].rstrip('/')}/ws/chat/{room.id}/"
+        parsed = urlparse(url)
+        secure = parsed.scheme == 'wss'
+        origin = options['origin'] or f"{'https' if secure else 'http'}://{parsed.netloc}"
+        
+        context_factory = None
+        if secure:
+            from twisted.internet.ssl import optionsForClientTLS
+            context_factory = optionsForClientTLS(parsed.hostname)
+        
+        for i in range(options['clients']):
+            session = sessions[i % len(sessions)]
+            factory = LoadTestClientFactory(run, url, origin=origin, headers={
+                'Cookie': f'{settings.SESSION_COOKIE_NAME}={session.session_key}',
+            })
+            connectWS(factory, context_factory)
+        
+        # Wait for the handshakes; rejected sockets never open
+        deadline = time.perf_counter() + 10
+        while len(run.opened) < options['clients'] and time.perf_counter() < deadline:
+            await task.deferLater(reactor, 0.05)
+        if not run.opened:
+            detail = run.errors[0] if run.errors else 'check the room, origin and server'
+            raise CommandError(f'No client could open {url} ({detail})')
+        
+        clients = list(run.opened)
+        interval = 1 / options['rate']
+        started = time.perf_counter()
+        while time.perf_counter() - started < options['duration']:
+            client = clients[run.sent % len(clients)]
+            client.sendMessage(json.dumps({'message': f'{run.prefix}{run.sent}:{time.perf_counter()}'}).encode())
+            run.sent += 1
+            # Keep the schedule even when a send runs late
+            await task.deferLater(reactor, max(0, started + run.sent * interval - time.perf_counter()))
+        run.send_elapsed = time.perf_counter() - started
+        
+        # Let in-flight broadcasts arrive
+        expected = run.sent * len(clients)
+        deadline = time.perf_counter() + 5
+        while len(run.latencies) < expected and time.perf_counter() < deadline:
+            await task.deferLater(reactor, 0.05)
+        run.elapsed = time.perf_counter() - started
+        run.clients = len(clients)
+        
+        run.accepting = False
+        for client in clients:
+            client.sendClose()
+        await task.deferLater(reactor, 0.2)
+        return run
+    
+    def report(self, run, options):
+        latencies = sorted(run.latencies)
+        expected = run.sent * run.clients
+        
+        self.stdout.write(f"{run.clients}/{options['clients']} clients connected")
+        self.stdout.write(f'sent:      {run.sent} messages, {run.sent / run.send_elapsed:.1f} msgs/sec')
+        self.stdout.write(
+            f'delivered: {len(latencies)}/{expected} frames, {len(latencies) / run.elapsed:.1f} msgs/sec'
+        )
+        if latencies:
+            p50 = latencies[int(len(latencies) * 0.50)]
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self.stdout.write(f'fan-out latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {latencies[-1]:.2f} ms')
+        for error in run.errors[:5]:
+            self.stderr.write(error)
+        
+        if len(latencies) < expected:
+            self.stderr.write(self.style.WARNING(f'{expected - len(latencies)} frames were not delivered'))
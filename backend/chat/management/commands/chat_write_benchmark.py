@@ -0,0 +1,75 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from chat.models import ChatRoom, Message
+from chat.writer import save_message, persist_messages, write_behind_options
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare saving chat messages one by one (current WebSocket path) with '
+        'write-behind batches. Runs against an existing room; all writes are rolled back.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('room_id', type=int)
+        parser.add_argument('--messages', type=int, default=500)
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Defaults to CHAT_WRITE_BEHIND MAX_BATCH_SIZE')
+    
+    def handle(self, *args, **options):
+        try:
+            room = ChatRoom.objects.get(id=options['room_id'])
+        except ChatRoom.DoesNotExist:
+            raise CommandError(f"Room {options['room_id']} does not exist")
+        
+        sender = room.users.first()
+        if sender is None:
+            raise CommandError('Room has no members')
+        
+        count = options['messages']
+        batch_size = options['batch_size'] or write_behind_options()['MAX_BATCH_SIZE']
+        
+        with transaction.atomic():
+            results = [
+                ('per-message', self.run_per_message(room, sender, count)),
+                (f'write-behind (batch {batch_size})', self.run_write_behind(room, sender, count, batch_size)),
+            ]
+            transaction.set_rollback(True)
+        
+        self.stdout.write(f'{count} messages into room {room.id} ({settings.DATABASES["default"]["ENGINE"]})')
+        for name, (elapsed, latencies) in results:
+            self.stdout.write(
+                f'{name:>28}: {count / elapsed:9.1f} msgs/sec, '
+                f'persist latency p50 {self.percentile(latencies, 50):7.2f} ms, '
+                f'p99 {self.percentile(latencies, 99):7.2f} ms'
+            )
+    
+    def run_per_message(self, room, sender, count):
+        latencies = []
+        started = time.perf_counter()
+        for i in range(count):
+            received = time.perf_counter()
+            save_message(room.id, sender, f'benchmark {i}')
+            latencies.append((time.perf_counter() - received) * 1000)
+        return time.perf_counter() - started, latencies
+    
+    def run_write_behind(self, room, sender, count, batch_size):
+        """Messages arrive back to back; latency is from arrival until the batch is saved"""
+        latencies = []
+        pending = []
+        started = time.perf_counter()
+        for i in range(count):
+            pending.append((time.perf_counter(), Message(room_id=room.id, sender=sender, content=f'benchmark {i}')))
+            if len(pending) >= batch_size or i == count - 1:
+                persist_messages([message for _, message in pending])
+                saved = time.perf_counter()
+                latencies.extend((saved - received) * 1000 for received, _ in pending)
+                pending = []
+        return time.perf_counter() - started, latencies
+    
+    @staticmethod
+    def percentile(values, pct):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * pct / 100))]
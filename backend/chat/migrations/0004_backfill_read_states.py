@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_read_states(apps, schema_editor):
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    Message = apps.get_model('chat', 'Message')
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+    Membership = ChatRoom.users.through
+    
+    # Unread messages per (room, sender); a member's count excludes their own
+    room_unread = {}
+    sent_unread = {}
+    rows = Message.objects.filter(is_read=False).order_by().values('room_id', 'sender_id').annotate(n=Count('id'))
+    for row in rows:
+        room_unread[row['room_id']] = room_unread.get(row['room_id'], 0) + row['n']
+        sent_unread[(row['room_id'], row['sender_id'])] = row['n']
+    
+    states = []
+    for room_id, user_id in Membership.objects.values_list('chatroom_id', 'user_id').iterator(chunk_size=1000):
+        unread = room_unread.get(room_id, 0) - sent_unread.get((room_id, user_id), 0)
+        states.append(ChatReadState(room_id=room_id, user_id=user_id, unread_count=unread))
+        
+        if len(states) >= 1000:
+            ChatReadState.objects.bulk_create(states, ignore_conflicts=True)
+            states = []
+    
+    if states:
+        ChatReadState.objects.bulk_create(states, ignore_conflicts=True)
+
+
+def clear_read_states(apps, schema_editor):
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+    ChatReadState.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_chatreadstate'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_read_states, clear_read_states),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+def assign_message_uids(apps, schema_editor):
+    Message = apps.get_model('chat', 'Message')
+    
+    batch = []
+    for message in Message.objects.filter(uid__isnull=True).only('id').iterator(chunk_size=1000):
+        message.uid = uuid.uuid4()
+        batch.append(message)
+        
+        if len(batch) >= 1000:
+            Message.objects.bulk_update(batch, ['uid'])
+            batch = []
+    
+    if batch:
+        Message.objects.bulk_update(batch, ['uid'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_backfill_read_states'),
+    ]
+
+    operations = [
+        # Nullable first so existing rows can get distinct uids
+        migrations.AddField(
+            model_name='message',
+            name='uid',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(assign_message_uids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='message',
+            name='uid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
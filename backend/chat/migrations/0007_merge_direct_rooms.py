@@ -0,0 +1,58 @@
+from django.db import migrations
+from django.db.models import Max
+
+
+def merge_direct_rooms(apps, schema_editor):
+    """
+    Give every two-member room its (low, high) key. Duplicate rooms of a
+    pair are merged into the one the views used to pick (the most recently
+    updated): messages and unread counts move over, the others are deleted.
+    """
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    Message = apps.get_model('chat', 'Message')
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+    Membership = ChatRoom.users.through
+    
+    members = {}
+    for room_id, user_id in Membership.objects.values_list('chatroom_id', 'user_id').iterator(chunk_size=1000):
+        members.setdefault(room_id, []).append(user_id)
+    
+    pairs = {}
+    for room_id, updated_at in ChatRoom.objects.order_by('-updated_at', '-id').values_list('id', 'updated_at'):
+        users = members.get(room_id, [])
+        if len(users) == 2 and users[0] != users[1]:
+            pairs.setdefault(tuple(sorted(users)), []).append((room_id, updated_at))
+    
+    for (low, high), rooms in pairs.items():
+        keep_id = rooms[0][0]
+        duplicate_ids = [room_id for room_id, _ in rooms[1:]]
+        
+        if duplicate_ids:
+            Message.objects.filter(room_id__in=duplicate_ids).update(room_id=keep_id)
+            
+            for user_id in (low, high):
+                states = ChatReadState.objects.filter(room_id__in=[keep_id] + duplicate_ids, user_id=user_id)
+                unread = sum(state.unread_count for state in states)
+                last_read_at = states.aggregate(last=Max('last_read_at'))['last']
+                ChatReadState.objects.update_or_create(
+                    room_id=keep_id, user_id=user_id,
+                    defaults={'unread_count': unread, 'last_read_at': last_read_at},
+                )
+            
+            ChatRoom.objects.filter(id__in=duplicate_ids).delete()
+        
+        # update() so auto_now keeps the room's latest activity
+        ChatRoom.objects.filter(id=keep_id).update(
+            user_low_id=low, user_high_id=high, updated_at=max(updated_at for _, updated_at in rooms),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_chatroom_user_low_user_high'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_direct_rooms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Separate from 0007: PostgreSQL can't alter the table in the transaction
+    # that just moved messages between rooms
+    dependencies = [
+        ('chat', '0007_merge_direct_rooms'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='chatroom',
+            constraint=models.UniqueConstraint(fields=('user_low', 'user_high'), name='chat_room_direct_pair'),
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+import uuid
+from django.db import models, transaction, IntegrityError
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -6,11 +8,17 @@ User = get_user_model()
 
 class ChatRoom(models.Model):
     users = models.ManyToManyField(User, related_name='chat_rooms')
+    # Canonical key of a direct (two-person) room: the lower and higher user id
+    user_low = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    user_high = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-updated_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user_low', 'user_high'], name='chat_room_direct_pair'),
+        ]
     
     def __str__(self):
         user_emails = ', '.join([user.email for user in self.users.all()[:2]])
@@ -19,17 +27,66 @@ class ChatRoom(models.Model):
     @property
     def room_name(self):
         return f"chat_{self.id}"
+    
+    @classmethod
+    def direct_room(cls, user_id, other_user_id):
+        """The direct room between two users, or None"""
+        low, high = sorted((int(user_id), int(other_user_id)))
+        return cls.objects.filter(user_low_id=low, user_high_id=high).first()
+    
+    @classmethod
+    def get_or_create_direct(cls, user_id, other_user_id):
+        """
+        Returns (room, created) for the direct room between two users.
+        The unique pair key makes concurrent creation safe.
+        """
+        low, high = sorted((int(user_id), int(other_user_id)))
+        room = cls.objects.filter(user_low_id=low, user_high_id=high).first()
+        if room:
+            return room, False
+        
+        try:
+            with transaction.atomic():
+                room = cls.objects.create(user_low_id=low, user_high_id=high)
+                room.users.add(low, high)
+            return room, True
+        except IntegrityError:
+            # Created by a concurrent request
+            return cls.objects.get(user_low_id=low, user_high_id=high), False
 
 
 class Message(models.Model):
     room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='messages')
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Assigned when the message is received, so a write-behind batch
+    # persists the same id and time that were broadcast
+    uid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     is_read = models.BooleanField(default=False)
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['room', 'timestamp'], name='chat_message_room_ts_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender.email}: {self.content[:50]}"
+
+
+class ChatReadState(models.Model):
+    """
+    Per-member read state of a room. unread_count is maintained on send
+    and reset on read, so unread badges never scan Message.
+    """
+    room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='read_states')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chat_read_states')
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        unique_together = ['room', 'user']
+    
+    def __str__(self):
+        return f"{self.user.email} in room {self.room_id}: {self.unread_count} unread"
@@ -0,0 +1,58 @@
+"""
+Per-user notification channel.
+
+Every user socket on ws/notifications/ joins the group user_<id>. Events
+are encoded once as the frame the client receives,
+{"type": <event type>, "data": {...}}, and forwarded as is:
+
+- message: a chat message in any of the user's rooms (data has room_id)
+- unread: a room's unread counter changed, on new messages and on reads
+  (data: room_id, unread_count, total)
+- connection: a connection request was sent, accepted or rejected
+"""
+import json
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+
+def user_group(user_id):
+    return f'user_{user_id}'
+
+
+def encode_event(event_type, data):
+    return json.dumps({'type': event_type, 'data': data}, separators=(',', ':'), default=str)
+
+
+async def send_to_users(channel_layer, user_ids, text):
+    """Forward a pre-encoded frame to every socket of the given users"""
+    for user_id in user_ids:
+        await channel_layer.group_send(user_group(user_id), {'type': 'user_event', 'text': text})
+
+
+async def send_unread_updates(channel_layer, updates):
+    """Send the (user_id, data) pairs of UnreadService.unread_updates()"""
+    for user_id, data in updates:
+        await send_to_users(channel_layer, [user_id], encode_event('unread', data))
+
+
+def notify_users(user_ids, event_type, data):
+    """
+    Send an event from synchronous code (views). Delivery is best effort:
+    a channel layer failure is logged and never fails the request.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(send_to_users)(channel_layer, user_ids, encode_event(event_type, data))
+    except Exception:
+        logger.exception('Could not deliver %s notification', event_type)
+
+
+def notify_unread(updates):
+    """Send the (user_id, data) pairs of UnreadService.unread_updates() from synchronous code"""
+    for user_id, data in updates:
+        notify_users([user_id], 'unread', data)
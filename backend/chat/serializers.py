@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import ChatRoom, Message
+from .services import UnreadService
 from profiles.serializers import ProfileSerializer
 
 
@@ -9,8 +10,8 @@ class MessageSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Message
-        fields = ['id', 'sender_id', 'sender_name', 'content', 'timestamp', 'is_read']
-        read_only_fields = ['id', 'timestamp']
+        fields = ['id', 'uid', 'sender_id', 'sender_name', 'content', 'timestamp', 'is_read']
+        read_only_fields = ['id', 'uid', 'timestamp']
 
 
 class ChatRoomSerializer(serializers.ModelSerializer):
@@ -24,13 +25,19 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_last_message(self, obj):
-        last_message = obj.messages.last()
+        # Rooms listed by get_rooms carry last_message_id with the messages preloaded
+        if hasattr(obj, 'last_message_id'):
+            last_message = self.context.get('last_messages', {}).get(obj.last_message_id)
+        else:
+            last_message = obj.messages.last()
         if last_message:
             return MessageSerializer(last_message).data
         return None
     
     def get_unread_count(self, obj):
+        if hasattr(obj, 'unread_count'):
+            return obj.unread_count
         request = self.context.get('request')
         if request and request.user:
-            return obj.messages.filter(is_read=False).exclude(sender=request.user).count()
+            return UnreadService.unread_count(obj.id, request.user.id)
         return 0
@@ -0,0 +1,72 @@
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import ChatReadState
+
+
+class UnreadService:
+    """Unread counters kept in ChatReadState, one row per room member"""
+    
+    @staticmethod
+    def add_members(room_id, user_ids):
+        ChatReadState.objects.bulk_create(
+            [ChatReadState(room_id=room_id, user_id=user_id) for user_id in user_ids],
+            ignore_conflicts=True
+        )
+    
+    @staticmethod
+    def message_sent(room_id, sender_id, count=1):
+        """Count `count` new messages from sender as unread for everyone else in the room"""
+        ChatReadState.objects.filter(room_id=room_id).exclude(user_id=sender_id).update(
+            unread_count=F('unread_count') + count
+        )
+    
+    @staticmethod
+    def mark_read(room_id, user_id):
+        """Reset the user's counter; returns True if anything was unread"""
+        return ChatReadState.objects.filter(
+            room_id=room_id, user_id=user_id, unread_count__gt=0
+        ).update(unread_count=0, last_read_at=timezone.now()) > 0
+    
+    @staticmethod
+    def unread_count(room_id, user_id):
+        state = ChatReadState.objects.filter(room_id=room_id, user_id=user_id).values_list(
+            'unread_count', flat=True
+        ).first()
+        return state or 0
+    
+    @staticmethod
+    def total_unread(user_id):
+        total = ChatReadState.objects.filter(user_id=user_id).aggregate(total=Sum('unread_count'))['total']
+        return total or 0
+    
+    @staticmethod
+    def unread_updates(sent):
+        """
+        Data of the 'unread' events owed after messages were sent: a
+        (user_id, {room_id, unread_count, total}) pair for every member
+        whose counter in a room went up. sent is an iterable of
+        (room_id, sender_id). Two queries.
+        """
+        senders = {}
+        for room_id, sender_id in sent:
+            senders.setdefault(room_id, set()).add(sender_id)
+        if not senders:
+            return []
+        
+        counts = [
+            (room_id, user_id, unread_count)
+            for room_id, user_id, unread_count in ChatReadState.objects.filter(
+                room_id__in=senders
+            ).values_list('room_id', 'user_id', 'unread_count')
+            if senders[room_id] - {user_id}
+        ]
+        if not counts:
+            return []
+        
+        totals = dict(ChatReadState.objects.filter(
+            user_id__in={user_id for _, user_id, _ in counts}
+        ).order_by().values('user_id').annotate(total=Sum('unread_count')).values_list('user_id', 'total'))
+        return [
+            (user_id, {'room_id': room_id, 'unread_count': unread_count, 'total': totals[user_id]})
+            for room_id, user_id, unread_count in counts
+        ]
@@ -0,0 +1,36 @@
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+from .models import ChatRoom
+from .services import UnreadService
+from .access import get_room_access
+
+
+@receiver(m2m_changed, sender=ChatRoom.users.through)
+def create_read_states(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        # user.chat_rooms.add(room, ...)
+        for room_id in pk_set:
+            UnreadService.add_members(room_id, [instance.pk])
+    else:
+        UnreadService.add_members(instance.pk, pk_set)
+
+
+@receiver(m2m_changed, sender=ChatRoom.users.through)
+def invalidate_room_access(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            get_room_access().invalidate(instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        for room_id in pk_set:
+            get_room_access().invalidate(room_id)
+    elif action == 'pre_clear':
+        # user.chat_rooms.clear() doesn't pass the affected rooms
+        for room_id in instance.chat_rooms.values_list('id', flat=True):
+            get_room_access().invalidate(room_id)
+
+
+@receiver(post_delete, sender=ChatRoom)
+def forget_deleted_room(sender, instance, **kwargs):
+    get_room_access().invalidate(instance.pk)
@@ -0,0 +1,322 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock, skipUnless
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.db import connection, OperationalError
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from connections.models import ConnectionRequest
+from . import writer
+from .models import ChatReadState, ChatRoom, Message
+from .notifications import user_group
+from .services import UnreadService
+from .writer import MessageWriter, persist_messages, save_message
+
+User = get_user_model()
+
+
+async def receive_events(channel_layer, channel):
+    """Every event waiting on a channel"""
+    events = []
+    while True:
+        try:
+            message = await asyncio.wait_for(channel_layer.receive(channel), 0.1)
+        except asyncio.TimeoutError:
+            return events
+        events.append(json.loads(message['text']))
+
+
+def listen(user):
+    """Channel receiving the user's notification events"""
+    channel_layer = get_channel_layer()
+    channel = async_to_sync(channel_layer.new_channel)()
+    async_to_sync(channel_layer.group_add)(user_group(user.id), channel)
+    return lambda: async_to_sync(receive_events)(channel_layer, channel)
+
+
+postgres_only = skipUnless(connection.vendor == 'postgresql', 'needs PostgreSQL (connectx_backend.test_settings)')
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Runs migrate_to against data created at migrate_from (historical models in self.apps)"""
+    
+    migrate_from = None
+    migrate_to = None
+    
+    def setUp(self):
+        self.apps = self.migrate(self.migrate_from)
+    
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+    
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+        return executor.loader.project_state([target]).apps
+
+
+@postgres_only
+class MessageWriterTests(TransactionTestCase):
+    """A failing write-behind batch only loses the messages that cannot be saved"""
+    
+    def setUp(self):
+        self.a = User.objects.create_user(email='a@example.com', username='a', password='x')
+        self.b = User.objects.create_user(email='b@example.com', username='b', password='x')
+        self.c = User.objects.create_user(email='c@example.com', username='c', password='x')
+        self.room, _ = ChatRoom.get_or_create_direct(self.a.id, self.b.id)
+        self.other_room, _ = ChatRoom.get_or_create_direct(self.a.id, self.c.id)
+        UnreadService.add_members(self.room.id, [self.a.id, self.b.id])
+        UnreadService.add_members(self.other_room.id, [self.a.id, self.c.id])
+        self.writer = MessageWriter(max_batch_size=100, max_batch_age=60, retries=2, retry_delay=0)
+    
+    def add(self, room_id, sender, content):
+        message = Message(room_id=room_id, sender=sender, content=content)
+        async_to_sync(self.writer.add)(message)
+        return message
+    
+    def flush(self):
+        async_to_sync(self.writer.flush)()
+    
+    def test_batch(self):
+        for i in range(3):
+            self.add(self.room.id, self.a, f'a{i}')
+            self.add(self.other_room.id, self.c, f'c{i}')
+        self.flush()
+        
+        self.assertEqual(Message.objects.count(), 6)
+        self.assertEqual(UnreadService.unread_count(self.room.id, self.b.id), 3)
+        self.assertEqual(UnreadService.total_unread(self.a.id), 3)
+    
+    def test_deleted_room_only_loses_its_messages(self):
+        kept = [self.add(self.room.id, self.a, f'a{i}') for i in range(3)]
+        self.add(self.other_room.id, self.c, 'lost')
+        kept.append(self.add(self.room.id, self.b, 'b'))
+        
+        # Deleted between the broadcast and the flush
+        self.other_room.delete()
+        with self.assertLogs('chat.writer', 'ERROR'):
+            self.flush()
+        
+        self.assertEqual(
+            sorted(Message.objects.values_list('uid', flat=True)),
+            sorted(message.uid for message in kept)
+        )
+        self.assertEqual(UnreadService.unread_count(self.room.id, self.b.id), 3)
+        self.assertEqual(UnreadService.unread_count(self.room.id, self.a.id), 1)
+    
+    def test_bad_message_only_loses_itself(self):
+        first = self.add(self.room.id, self.a, 'first')
+        duplicate = self.add(self.room.id, self.a, 'duplicate uid')
+        last = self.add(self.room.id, self.b, 'last')
+        Message.objects.create(room=self.other_room, sender=self.c, content='saved', uid=duplicate.uid)
+        with self.assertLogs('chat.writer', 'ERROR'):
+            self.flush()
+        
+        contents = set(Message.objects.filter(room=self.room).values_list('content', flat=True))
+        self.assertEqual(contents, {first.content, last.content})
+        self.assertEqual(UnreadService.unread_count(self.room.id, self.b.id), 1)
+    
+    def test_unread_counts_are_sent_after_the_batch(self):
+        events_of = {user: listen(user) for user in (self.a, self.b, self.c)}
+        self.add(self.room.id, self.a, 'a0')
+        self.add(self.room.id, self.a, 'a1')
+        self.add(self.other_room.id, self.c, 'c0')
+        self.flush()
+        
+        self.assertEqual(events_of[self.b](), [
+            {'type': 'unread', 'data': {'room_id': self.room.id, 'unread_count': 2, 'total': 2}},
+        ])
+        self.assertEqual(events_of[self.a](), [
+            {'type': 'unread', 'data': {'room_id': self.other_room.id, 'unread_count': 1, 'total': 1}},
+        ])
+        self.assertEqual(events_of[self.c](), [])
+    
+    def test_transient_error_is_retried(self):
+        persist = writer.persist_messages
+        calls = []
+        
+        def flaky(messages):
+            calls.append(len(messages))
+            if len(calls) == 1:
+                raise OperationalError('connection lost')
+            persist(messages)
+        
+        for i in range(4):
+            self.add(self.room.id, self.a, f'a{i}')
+        with mock.patch.object(writer, 'persist_messages', flaky), self.assertLogs('chat.writer', 'WARNING'):
+            self.flush()
+        
+        # Whole batch again, not message by message
+        self.assertEqual(calls, [4, 4])
+        self.assertEqual(Message.objects.count(), 4)
+        self.assertEqual(UnreadService.unread_count(self.room.id, self.b.id), 4)
+
+
+@postgres_only
+class UnreadCounterTests(TestCase):
+    """Per-member unread counters (ChatReadState)"""
+    
+    def setUp(self):
+        self.a = User.objects.create_user(email='a@example.com', username='a', password='x')
+        self.b = User.objects.create_user(email='b@example.com', username='b', password='x')
+        ConnectionRequest.objects.create(sender=self.a, receiver=self.b, status='accepted')
+        self.room, _ = ChatRoom.get_or_create_direct(self.a.id, self.b.id)
+    
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+    
+    def counts(self, room):
+        return (UnreadService.unread_count(room.id, self.a.id), UnreadService.unread_count(room.id, self.b.id))
+    
+    def test_sending_counts_for_the_recipient_only(self):
+        self.assertEqual(self.counts(self.room), (0, 0))
+        response = self.client_for(self.a).post('/api/chat/send/', {'recipientId': self.b.id, 'message': 'hi'})
+        self.assertEqual(response.status_code, 201)
+        save_message(self.room.id, self.a, 'again')
+        save_message(self.room.id, self.b, 'hello')
+        self.assertEqual(self.counts(self.room), (1, 2))
+        
+        unread = self.client_for(self.b).get('/api/chat/unread').data['data']['total']
+        self.assertEqual(unread, 2)
+    
+    def test_reading_resets_the_counter(self):
+        for i in range(3):
+            save_message(self.room.id, self.a, f'a{i}')
+        save_message(self.room.id, self.b, 'b')
+        
+        response = self.client_for(self.b).get(f'/api/chat/room/{self.room.id}/messages')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counts(self.room), (1, 0))
+        self.assertFalse(Message.objects.filter(room=self.room, sender=self.a, is_read=False).exists())
+        
+        response = self.client_for(self.a).get(f'/api/chat/thread/{self.b.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counts(self.room), (0, 0))
+        self.assertEqual(UnreadService.total_unread(self.a.id), 0)
+    
+    def test_batch_counts_like_single_saves(self):
+        c = User.objects.create_user(email='c@example.com', username='c', password='x')
+        batch_room, _ = ChatRoom.get_or_create_direct(self.a.id, c.id)
+        single_room = self.room
+        senders = [self.a, self.a, self.b, self.a, self.b, self.b, self.b]
+        
+        for sender in senders:
+            save_message(single_room.id, sender, 'x')
+        # c plays b's part in the batch room
+        persist_messages([
+            Message(room_id=batch_room.id, sender=c if sender == self.b else sender, content='x')
+            for sender in senders
+        ])
+        
+        self.assertEqual(UnreadService.unread_count(batch_room.id, self.a.id), self.counts(single_room)[0])
+        self.assertEqual(UnreadService.unread_count(batch_room.id, c.id), self.counts(single_room)[1])
+        self.assertEqual(self.counts(single_room), (4, 3))
+
+
+@postgres_only
+class ReadStateBackfillTests(MigrationTestCase):
+    migrate_from = ('chat', '0003_chatreadstate')
+    migrate_to = ('chat', '0004_backfill_read_states')
+    
+    def test_backfill(self):
+        ChatRoom = self.apps.get_model('chat', 'ChatRoom')
+        HistoricalMessage = self.apps.get_model('chat', 'Message')
+        a = User.objects.create_user(email='a@example.com', username='a', password='x')
+        b = User.objects.create_user(email='b@example.com', username='b', password='x')
+        c = User.objects.create_user(email='c@example.com', username='c', password='x')
+        room = ChatRoom.objects.create()
+        room.users.add(a.id, b.id)
+        other = ChatRoom.objects.create()
+        other.users.add(a.id, c.id)
+        for sender, is_read in [(a, False), (a, False), (b, False), (a, True), (b, True)]:
+            HistoricalMessage.objects.create(room=room, sender_id=sender.id, content='x', is_read=is_read)
+        
+        self.migrate(self.migrate_to)
+        
+        states = {
+            (state.room_id, state.user_id): state.unread_count
+            for state in ChatReadState.objects.all()
+        }
+        self.assertEqual(states, {
+            (room.id, a.id): 1, (room.id, b.id): 2,
+            (other.id, a.id): 0, (other.id, c.id): 0,
+        })
+
+
+@postgres_only
+class MergeDirectRoomsTests(MigrationTestCase):
+    migrate_from = ('chat', '0006_chatroom_user_low_user_high')
+    migrate_to = ('chat', '0007_merge_direct_rooms')
+    
+    def test_duplicate_rooms_are_merged(self):
+        ChatRoom = self.apps.get_model('chat', 'ChatRoom')
+        HistoricalMessage = self.apps.get_model('chat', 'Message')
+        ReadState = self.apps.get_model('chat', 'ChatReadState')
+        a = User.objects.create_user(email='a@example.com', username='a', password='x')
+        b = User.objects.create_user(email='b@example.com', username='b', password='x')
+        c = User.objects.create_user(email='c@example.com', username='c', password='x')
+        
+        old, new, single = ChatRoom.objects.create(), ChatRoom.objects.create(), ChatRoom.objects.create()
+        # Members added in both orders
+        old.users.add(b.id, a.id)
+        new.users.add(a.id, b.id)
+        single.users.add(c.id, a.id)
+        ChatRoom.objects.filter(id=old.id).update(updated_at=timezone.now() - timedelta(days=1))
+        
+        uids = set()
+        for room, sender, count in [(old, a, 3), (old, b, 2), (new, b, 1), (new, a, 2), (single, c, 1)]:
+            for i in range(count):
+                uids.add(HistoricalMessage.objects.create(room=room, sender_id=sender.id, content=f'{i}').uid)
+        for room, user, unread in [(old, a, 2), (old, b, 3), (new, a, 1), (new, b, 2), (single, a, 1), (single, c, 0)]:
+            ReadState.objects.create(room=room, user_id=user.id, unread_count=unread)
+        
+        self.migrate(self.migrate_to)
+        
+        # The most recently updated room is kept, with everything of both
+        self.assertFalse(ChatRoom.objects.filter(id=old.id).exists())
+        merged = ChatRoom.objects.get(id=new.id)
+        self.assertEqual((merged.user_low_id, merged.user_high_id), (a.id, b.id))
+        self.assertEqual(set(merged.users.values_list('id', flat=True)), {a.id, b.id})
+        self.assertEqual(
+            sorted(Message.objects.filter(room_id=new.id).values_list('sender_id', flat=True)),
+            sorted([a.id] * 5 + [b.id] * 3)
+        )
+        self.assertEqual(set(Message.objects.values_list('uid', flat=True)), uids)
+        self.assertEqual(
+            dict(ChatReadState.objects.filter(room_id=new.id).values_list('user_id', 'unread_count')),
+            {a.id: 3, b.id: 5}
+        )
+        
+        single = ChatRoom.objects.get(id=single.id)
+        self.assertEqual((single.user_low_id, single.user_high_id), (a.id, c.id))
+        self.assertEqual(Message.objects.filter(room_id=single.id).count(), 1)
+
+
+@postgres_only
+class UnreadNotificationTests(TestCase):
+    def test_sending_notifies_the_recipient(self):
+        a = User.objects.create_user(email='a@example.com', username='a', password='x')
+        b = User.objects.create_user(email='b@example.com', username='b', password='x')
+        ConnectionRequest.objects.create(sender=a, receiver=b, status='accepted')
+        events_of_a, events_of_b = listen(a), listen(b)
+        client = APIClient()
+        client.force_authenticate(a)
+        
+        for count in (1, 2):
+            response = client.post('/api/chat/send/', {'recipientId': b.id, 'message': f'm{count}'})
+            self.assertEqual(response.status_code, 201)
+            
+            events = events_of_b()
+            self.assertEqual([event['type'] for event in events], ['message', 'unread'])
+            self.assertEqual(events[1]['data'], {
+                'room_id': ChatRoom.direct_room(a.id, b.id).id, 'unread_count': count, 'total': count,
+            })
+            self.assertEqual([event['type'] for event in events_of_a()], ['message'])
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import get_or_create_room, get_rooms, get_messages, send_message, get_thread
+from .views import get_or_create_room, get_rooms, get_messages, send_message, get_thread, get_unread_count
 
 urlpatterns = [
     path('room/create', get_or_create_room, name='create_room'),
@@ -7,4 +7,5 @@ urlpatterns = [
     path('room/<int:room_id>/messages', get_messages, name='get_messages'),
     path('send/', send_message, name='send_message'),
     path('thread/<int:user_id>/', get_thread, name='get_thread'),
+    path('unread', get_unread_count, name='get_unread_count'),
 ]
@@ -3,10 +3,77 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
-from .models import ChatRoom, Message
+from django.db.models import Q, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import ChatRoom, Message, ChatReadState
+from .services import UnreadService
+from .notifications import notify_users, notify_unread
 from .serializers import ChatRoomSerializer, MessageSerializer
 from connections.models import ConnectionRequest
+from connectx_backend.pagination import KeysetPaginator, InvalidCursor, decode_cursor
+
+MESSAGE_PAGE_SIZE = 50
+MAX_MESSAGE_PAGE_SIZE = 200
+
+
+def notify_read(user, room):
+    """Tell the user's other sockets that the room has been read"""
+    notify_users([user.id], 'unread', {
+        'room_id': room.id,
+        'unread_count': 0,
+        'total': UnreadService.total_unread(user.id),
+    })
+
+
+def mark_room_read(user, room, messages):
+    """
+    Mark the room's messages from others as read, including the already
+    loaded page so the response shows them read (skipped when the counter
+    says nothing is unread)
+    """
+    if UnreadService.mark_read(room.id, user.id):
+        room.messages.filter(is_read=False).exclude(sender=user).update(is_read=True)
+        for message in messages:
+            if message.sender_id != user.id:
+                message.is_read = True
+        notify_read(user, room)
+
+
+def message_page(request, room):
+    """
+    Window of a room's messages over (timestamp, id), oldest first.
+    
+    Without a cursor this is the latest `limit` messages. The `before`
+    cursor of a page fetches older messages, `after` fetches newer ones.
+    Raises ValueError (InvalidCursor) for a bad limit or cursor.
+    """
+    limit = int(request.GET.get('limit', MESSAGE_PAGE_SIZE))
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    limit = min(limit, MAX_MESSAGE_PAGE_SIZE)
+    
+    before = request.GET.get('before') or None
+    after = request.GET.get('after') or None
+    if before and after:
+        raise ValueError('Pass either before or after, not both')
+    
+    # before cursors page forward through (-timestamp, -id), after cursors backward
+    cursor = before or after
+    if cursor and decode_cursor(cursor)[1] != bool(after):
+        raise InvalidCursor('Invalid cursor')
+    
+    paginator = KeysetPaginator(('-timestamp', '-id'), limit)
+    page = paginator.paginate(room.messages.select_related('sender', 'sender__profile'), cursor)
+    
+    pagination = {
+        'limit': limit,
+        'before': page.next_cursor,
+        # Always hand out an after cursor so clients can poll for newer messages
+        'after': paginator.cursor_for(page.items[0], reverse=True) if page.items else after,
+        'hasOlder': page.has_next,
+        'hasNewer': page.has_prev,
+    }
+    return list(reversed(page.items)), pagination
 
 
 @api_view(['POST'])
@@ -33,16 +100,8 @@ def get_or_create_room(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Check if room already exists
-    # This queries for rooms that have both users
-    # We use distinct() to avoid duplicates if multiple rooms exist (though they shouldn't)
-    existing_rooms = ChatRoom.objects.filter(users=request.user).filter(users__id=target_user_id)
-    
-    if existing_rooms.exists():
-        room = existing_rooms.first()
-    else:
-        room = ChatRoom.objects.create()
-        room.users.add(request.user, target_user_id)
+    # One room per pair, looked up by its (low, high) user key
+    room, _ = ChatRoom.get_or_create_direct(request.user.id, target_user_id)
     
     return Response(ChatRoomSerializer(room, context={'request': request}).data)
 
@@ -51,14 +110,32 @@ def get_or_create_room(request):
 @permission_classes([IsAuthenticated])
 def get_rooms(request):
     """Get all chat rooms for the current user"""
-    rooms = request.user.chat_rooms.all().prefetch_related('users', 'messages')
-    return Response(ChatRoomSerializer(rooms, many=True, context={'request': request}).data)
+    last_message = Message.objects.filter(
+        room=OuterRef('pk')
+    ).order_by('-timestamp', '-id').values('id')[:1]
+    
+    unread_count = ChatReadState.objects.filter(
+        room=OuterRef('pk'), user=request.user
+    ).values('unread_count')[:1]
+    
+    rooms = list(request.user.chat_rooms.annotate(
+        last_message_id=Subquery(last_message),
+        unread_count=Coalesce(Subquery(unread_count), 0),
+    ).prefetch_related('users'))
+    
+    # Load only each room's latest message, not its history
+    last_messages = Message.objects.select_related('sender__profile').in_bulk(
+        [room.last_message_id for room in rooms if room.last_message_id]
+    )
+    
+    context = {'request': request, 'last_messages': last_messages}
+    return Response(ChatRoomSerializer(rooms, many=True, context=context).data)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_messages(request, room_id):
-    """Get messages for a specific room"""
+    """Get a page of messages for a specific room (see message_page)"""
     room = get_object_or_404(ChatRoom, id=room_id)
     
     # Verify user is in the room
@@ -68,11 +145,19 @@ def get_messages(request, room_id):
             status=status.HTTP_403_FORBIDDEN
         )
     
+    try:
+        messages, pagination = message_page(request, room)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
     # Mark unread messages as read
-    room.messages.filter(is_read=False).exclude(sender=request.user).update(is_read=True)
+    mark_room_read(request.user, room, messages)
     
-    messages = room.messages.all().select_related('sender', 'sender__profile')
-    return Response(MessageSerializer(messages, many=True).data)
+    return Response({
+        'success': True,
+        'data': MessageSerializer(messages, many=True).data,
+        'pagination': pagination
+    })
 
 
 @api_view(['POST'])
@@ -127,13 +212,7 @@ def send_message(request):
         )
     
     # Get or create chat room
-    existing_rooms = ChatRoom.objects.filter(users=request.user).filter(users=recipient)
-    
-    if existing_rooms.exists():
-        room = existing_rooms.first()
-    else:
-        room = ChatRoom.objects.create()
-        room.users.add(request.user, recipient)
+    room, _ = ChatRoom.get_or_create_direct(request.user.id, recipient.id)
     
     # Create message
     message = Message.objects.create(
@@ -141,9 +220,14 @@ def send_message(request):
         sender=request.user,
         content=message_content
     )
+    UnreadService.message_sent(room.id, request.user.id)
+    
+    message_data = MessageSerializer(message).data
+    notify_users([request.user.id, recipient.id], 'message', {**message_data, 'room_id': room.id})
+    notify_unread(UnreadService.unread_updates([(room.id, request.user.id)]))
     
     return Response(
-        MessageSerializer(message).data,
+        message_data,
         status=status.HTTP_201_CREATED
     )
 
@@ -154,7 +238,12 @@ def get_thread(request, user_id):
     """
     GET /api/messages/thread/<user_id>
     
-    Get all messages between logged-in user and target user
+    Get messages between logged-in user and target user, latest first page
+    
+    Query params:
+    - limit: Page size (default 50, max 200)
+    - before: Cursor for older messages
+    - after: Cursor for newer messages
     """
     # Check if target user exists
     try:
@@ -168,7 +257,7 @@ def get_thread(request, user_id):
         )
     
     # Find chat room between users
-    room = ChatRoom.objects.filter(users=request.user).filter(users=target_user).first()
+    room = ChatRoom.direct_room(request.user.id, target_user.id)
     
     if not room:
         # No conversation exists yet
@@ -178,15 +267,31 @@ def get_thread(request, user_id):
             'roomId': None
         })
     
-    # Mark unread messages as read
-    room.messages.filter(is_read=False).exclude(sender=request.user).update(is_read=True)
+    try:
+        messages, pagination = message_page(request, room)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Get all messages
-    messages = room.messages.all().select_related('sender', 'sender__profile')
+    # Mark unread messages as read
+    mark_room_read(request.user, room, messages)
     
     return Response({
         'success': True,
         'data': MessageSerializer(messages, many=True).data,
-        'roomId': room.id
+        'roomId': room.id,
+        'pagination': pagination
     })
 
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_unread_count(request):
+    """
+    GET /api/chat/unread
+    
+    Total unread messages for the logged-in user, for the nav badge
+    """
+    return Response({
+        'success': True,
+        'data': {'total': UnreadService.total_unread(request.user.id)}
+    })
@@ -0,0 +1,199 @@
+"""
+Write-behind persistence for WebSocket chat messages.
+
+With CHAT_WRITE_BEHIND['ENABLED'], ChatConsumer broadcasts a message as
+soon as it is received (identified by its uid) and hands it to the
+MessageWriter of its event loop. The writer persists messages in batches
+with bulk_create once MAX_BATCH_SIZE messages are pending or the oldest
+has waited MAX_BATCH_AGE seconds, and whenever a socket disconnects.
+MAX_BATCH_AGE bounds how much acknowledged chat a crashed worker can lose.
+
+A batch that fails on a transient database error is retried RETRIES times;
+after that (or on any other error) each room, then each message, is saved
+on its own so a bad row (e.g. a room deleted since the broadcast) only
+loses itself.
+
+Broadcast events of unsaved messages carry no id; clients key messages on
+uid, which is the same before and after the message is persisted.
+"""
+import asyncio
+import logging
+import weakref
+from collections import Counter
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction, InterfaceError, OperationalError
+from .models import ChatRoom, Message
+from .notifications import send_unread_updates
+from .services import UnreadService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHAT_WRITE_BEHIND = {
+    'ENABLED': False,
+    'MAX_BATCH_SIZE': 50,
+    'MAX_BATCH_AGE': 0.5,
+    'RETRIES': 2,
+    'RETRY_DELAY': 0.2,
+}
+
+# Errors worth retrying a whole batch for (lost connection, deadlock, ...)
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+def write_behind_options():
+    return {**DEFAULT_CHAT_WRITE_BEHIND, **getattr(settings, 'CHAT_WRITE_BEHIND', {})}
+
+
+def save_message(room_id, sender, content):
+    """Synchronous path: insert one message, bump unread counters, touch the room"""
+    message = Message.objects.create(room_id=room_id, sender=sender, content=content)
+    
+    UnreadService.message_sent(room_id, sender.id)
+    
+    # Update room's updated_at timestamp
+    ChatRoom.objects.filter(id=room_id).update(updated_at=message.timestamp)
+    
+    return message
+
+
+def persist_messages(messages):
+    """
+    Insert a batch of unsaved messages, bump the unread counters and touch
+    each room's updated_at. Same effect as saving them one by one.
+    """
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+        
+        for (room_id, sender_id), count in Counter((m.room_id, m.sender_id) for m in messages).items():
+            UnreadService.message_sent(room_id, sender_id, count)
+        
+        latest = {}
+        for message in messages:
+            latest[message.room_id] = max(latest.get(message.room_id, message.timestamp), message.timestamp)
+        for room_id, timestamp in latest.items():
+            ChatRoom.objects.filter(id=room_id).update(updated_at=timestamp)
+
+
+def reset_ids(messages):
+    """Forget the ids bulk_create assigned in a transaction that was rolled back"""
+    for message in messages:
+        message.pk = None
+        message._state.adding = True
+
+
+def persist_separately(messages):
+    """
+    Save each room's messages with persist_messages(), and a room's
+    messages one by one if that fails too. Returns the number of messages
+    that could not be saved.
+    """
+    rooms = {}
+    for message in messages:
+        rooms.setdefault(message.room_id, []).append(message)
+    
+    dropped = 0
+    for room_messages in rooms.values():
+        if len(room_messages) > 1:
+            try:
+                persist_messages(room_messages)
+                continue
+            except Exception:
+                reset_ids(room_messages)
+        
+        for message in room_messages:
+            try:
+                persist_messages([message])
+            except Exception:
+                reset_ids([message])
+                dropped += 1
+                logger.exception('Dropped chat message %s in room %s', message.uid, message.room_id)
+    return dropped
+
+
+class MessageWriter:
+    def __init__(self, max_batch_size, max_batch_age, retries=0, retry_delay=0):
+        self.max_batch_size = max_batch_size
+        self.max_batch_age = max_batch_age
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.pending = []
+        self._timer = None
+        self._tasks = set()
+        # Batches are written one at a time so they land in receive order
+        self._lock = asyncio.Lock()
+    
+    async def add(self, message):
+        self.pending.append(message)
+        if len(self.pending) >= self.max_batch_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_batch_age, self._flush_soon)
+    
+    def _flush_soon(self):
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def flush(self):
+        """Persist everything pending"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        
+        async with self._lock:
+            await self._persist(batch)
+            await self._notify_unread([message for message in batch if message.pk is not None])
+    
+    async def _persist(self, batch):
+        for attempt in range(self.retries + 1):
+            try:
+                await database_sync_to_async(persist_messages)(batch)
+                return
+            except TRANSIENT_ERRORS:
+                reset_ids(batch)
+                logger.warning('Saving %d chat messages failed (attempt %d)', len(batch), attempt + 1, exc_info=True)
+                if attempt < self.retries:
+                    await asyncio.sleep(self.retry_delay * (attempt + 1))
+            except Exception:
+                reset_ids(batch)
+                logger.warning('Saving %d chat messages failed', len(batch), exc_info=True)
+                break
+        
+        dropped = await database_sync_to_async(persist_separately)(batch)
+        if dropped:
+            logger.error('Dropped %d of %d chat messages that could not be saved', dropped, len(batch))
+    
+    async def _notify_unread(self, saved):
+        """Send the recipients of the saved messages their new unread counts (best effort)"""
+        channel_layer = get_channel_layer()
+        if not saved or channel_layer is None:
+            return
+        try:
+            updates = await database_sync_to_async(UnreadService.unread_updates)(
+                {(message.room_id, message.sender_id) for message in saved}
+            )
+            await send_unread_updates(channel_layer, updates)
+        except Exception:
+            logger.exception('Could not deliver unread notifications')
+
+
+_writers = weakref.WeakKeyDictionary()
+
+
+def get_message_writer():
+    """MessageWriter for the running event loop"""
+    loop = asyncio.get_running_loop()
+    writer = _writers.get(loop)
+    if writer is None:
+        options = write_behind_options()
+        writer = _writers[loop] = MessageWriter(
+            options['MAX_BATCH_SIZE'], options['MAX_BATCH_AGE'], options['RETRIES'], options['RETRY_DELAY']
+        )
+    return writer
@@ -0,0 +1,99 @@
+"""
+Tag-to-skill affinity between discussions and users.
+
+A discussion's tags and a user's skills are both binary vectors over
+canonical names (Skill.canonical_name), normalized to unit length, and
+affinity is their cosine: shared / sqrt(tags * skills).
+
+The discussion side is precomputed into DiscussionTag rows (integer
+weights so sums compare exactly), so ranking a feed by affinity reads
+only the tag rows of the user's skills instead of every discussion.
+"""
+import math
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum
+from profiles.models import Skill
+from .models import Discussion, DiscussionTag
+
+WEIGHT_SCALE = 1000000
+
+
+def canonical_tags(tags):
+    """Distinct canonical tag names, in order"""
+    names = []
+    for tag in tags or []:
+        name = Skill.canonical_name(tag)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def tag_vector(tags):
+    """{name: weight} unit vector of tags, scaled to integers"""
+    names = canonical_tags(tags)
+    if not names:
+        return {}
+    weight = round(WEIGHT_SCALE / math.sqrt(len(names)))
+    return {name: weight for name in names}
+
+
+def index_discussion(discussion_id, tags):
+    """Replace the stored tag vector of one discussion"""
+    with transaction.atomic():
+        DiscussionTag.objects.filter(discussion_id=discussion_id).delete()
+        DiscussionTag.objects.bulk_create([
+            DiscussionTag(discussion_id=discussion_id, name=name, weight=weight)
+            for name, weight in tag_vector(tags).items()
+        ])
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute every tag vector, e.g. after bulk imports that bypass signals"""
+    DiscussionTag.objects.all().delete()
+    batch = []
+    for discussion_id, tags in Discussion.objects.values_list('id', 'tags').iterator(chunk_size=1000):
+        batch.extend(
+            DiscussionTag(discussion_id=discussion_id, name=name, weight=weight)
+            for name, weight in tag_vector(tags).items()
+        )
+        if len(batch) >= 1000:
+            DiscussionTag.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        DiscussionTag.objects.bulk_create(batch)
+
+
+class AffinityScorer:
+    """Scores discussions against one user's skills"""
+
+    def __init__(self, skills):
+        self.skills = set(canonical_tags(skills))
+
+    def score(self, tags):
+        """Cosine affinity as a 0-100 integer"""
+        names = canonical_tags(tags)
+        if not names or not self.skills:
+            return 0
+        shared = sum(1 for name in names if name in self.skills)
+        return round(shared / math.sqrt(len(names) * len(self.skills)) * 100)
+
+    def scores(self, tag_lists):
+        """score() of each tag list, in input order"""
+        return [self.score(tags) for tags in tag_lists]
+
+    def matched(self, queryset):
+        """
+        Discussions of queryset sharing a tag with the user's skills,
+        annotated with `affinity` (sum of the shared tag weights; orders
+        like the cosine since the user's norm is constant)
+        """
+        shared = DiscussionTag.objects.filter(name__in=self.skills)
+        affinity = shared.filter(discussion=OuterRef('pk')).order_by().values('discussion').annotate(
+            total=Sum('weight')
+        ).values('total')
+        return queryset.filter(id__in=shared.values('discussion_id')).annotate(affinity=Subquery(affinity))
+
+    def unmatched(self, queryset):
+        """Discussions of queryset sharing no tag with the user's skills"""
+        return queryset.exclude(id__in=DiscussionTag.objects.filter(name__in=self.skills).values('discussion_id'))
@@ -0,0 +1,73 @@
+"""
+Shared cache of discussion feed pages.
+
+Pages hold only the fields that are the same for every viewer; the views
+overlay is_liked, time_ago and match_score per request. Entries are keyed
+by a feed version that signals bump whenever a discussion, like, comment
+or the author fields of a poster's profile change, so stale pages are
+never read again and simply expire.
+"""
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'community:feed:version'
+
+
+def feed_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so a lost version can't revive old pages
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _page_key(version, params):
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f'community:feed:{version}:{digest}'
+
+
+def get_cached_page(version, params):
+    """
+    Cached (items, pagination) of the feed page for params (a tuple of the
+    query parameters), or None when missing or caching is disabled
+    """
+    if not settings.COMMUNITY_FEED_CACHE_TIMEOUT:
+        return None
+    return cache.get(_page_key(version, params))
+
+
+def cache_page(version, params, items, pagination):
+    # version is the one read before the page was queried, so a change in
+    # between leaves the page under the old version
+    if settings.COMMUNITY_FEED_CACHE_TIMEOUT:
+        cache.set(_page_key(version, params), (items, pagination), settings.COMMUNITY_FEED_CACHE_TIMEOUT)
+
+
+def _author_fingerprint(profile):
+    """Hash of the profile fields feed pages show about an author"""
+    fields = (profile.full_name, profile.avatar, profile.college)
+    return hashlib.md5(repr(fields).encode()).hexdigest()
+
+
+def author_fields_changed(profile):
+    """
+    Whether a saved profile changed what the feed shows about its user.
+    Saves that leave those fields untouched (e.g. a last_login update
+    propagated from the User) return False and keep the cache warm.
+    """
+    fingerprint = _author_fingerprint(profile)
+    key = f'community:feed:author:{profile.user_id}'
+    if cache.get(key) == fingerprint:
+        return False
+    cache.set(key, fingerprint, None)
+    return True
+
+
+def invalidate_feed():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), None)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from community import affinity
+from community.models import DiscussionTag
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the discussion tag vectors used by the relevance feed'
+    
+    def handle(self, *args, **options):
+        affinity.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Discussion tag vectors rebuilt ({DiscussionTag.objects.count()} entries)'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from community.stats import CommunityStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount the community summary and top contributor statistics. '
+        'Signals keep them current; run this after bulk imports or deletes, '
+        'or periodically to correct drift.'
+    )
+    
+    def handle(self, *args, **options):
+        counts = CommunityStats.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            'Community stats refreshed (' + ', '.join(f'{key}: {value}' for key, value in counts.items()) + ')'
+        ))
@@ -0,0 +1,28 @@
+from django.db import migrations
+from connectx_backend.db import PostgresOnlyRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0001_initial'),
+    ]
+
+    operations = [
+        # Serve tags__contains (@>) lookups
+        PostgresOnlyRunSQL(
+            'CREATE INDEX community_discussion_tags_gin ON community_discussion USING gin (tags);',
+            'DROP INDEX IF EXISTS community_discussion_tags_gin;',
+        ),
+        PostgresOnlyRunSQL(
+            'CREATE INDEX community_event_tags_gin ON community_event USING gin (tags);',
+            'DROP INDEX IF EXISTS community_event_tags_gin;',
+        ),
+        # Expression must match what community.search generates
+        PostgresOnlyRunSQL(
+            "CREATE INDEX community_discussion_search_fts ON community_discussion "
+            "USING gin (to_tsvector('simple'::regconfig, "
+            "COALESCE(title, '') || ' ' || COALESCE(description, '')));",
+            'DROP INDEX IF EXISTS community_discussion_search_fts;',
+        ),
+    ]
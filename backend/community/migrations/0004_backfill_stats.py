@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Discussion = apps.get_model('community', 'Discussion')
+    Event = apps.get_model('community', 'Event')
+    CommunityStat = apps.get_model('community', 'CommunityStat')
+    ContributorStat = apps.get_model('community', 'ContributorStat')
+    
+    # Keys and the project tag as in community.stats
+    CommunityStat.objects.bulk_create([
+        CommunityStat(key='members', value=User.objects.count()),
+        CommunityStat(key='discussions', value=Discussion.objects.count()),
+        CommunityStat(key='events', value=Event.objects.count()),
+        CommunityStat(key='projects', value=Discussion.objects.filter(tags__contains=['project']).count()),
+    ], ignore_conflicts=True)
+    
+    ContributorStat.objects.bulk_create([
+        ContributorStat(user_id=row['author_id'], posts_count=row['n'])
+        for row in Discussion.objects.order_by().values('author_id').annotate(n=Count('id'))
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+def clear_stats(apps, schema_editor):
+    apps.get_model('community', 'CommunityStat').objects.all().delete()
+    apps.get_model('community', 'ContributorStat').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0003_communitystat_contributorstat'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_stats, clear_stats),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0004_backfill_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscussionTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('weight', models.PositiveIntegerField()),
+                ('discussion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_vector', to='community.discussion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name', 'discussion'], name='community_tag_name_idx')],
+                'unique_together': {('discussion', 'name')},
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+import math
+from django.db import migrations
+
+
+def build_tag_vectors(apps, schema_editor):
+    Discussion = apps.get_model('community', 'Discussion')
+    DiscussionTag = apps.get_model('community', 'DiscussionTag')
+    
+    # Same vectors as community.affinity.tag_vector
+    batch = []
+    for discussion_id, tags in Discussion.objects.values_list('id', 'tags').iterator(chunk_size=1000):
+        names = []
+        for tag in tags or []:
+            name = tag.lower().strip()
+            if name and name not in names:
+                names.append(name)
+        for name in names:
+            batch.append(DiscussionTag(
+                discussion_id=discussion_id, name=name, weight=round(1000000 / math.sqrt(len(names)))
+            ))
+        
+        if len(batch) >= 1000:
+            DiscussionTag.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    
+    if batch:
+        DiscussionTag.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def clear_tag_vectors(apps, schema_editor):
+    apps.get_model('community', 'DiscussionTag').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0005_discussiontag'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_tag_vectors, clear_tag_vectors),
+    ]
@@ -20,6 +20,25 @@ class Discussion(models.Model):
     def replies(self):
         return self.comments.count()
 
+class DiscussionTag(models.Model):
+    """
+    One entry of a discussion's normalized tag vector: the canonical tag
+    name and its weight (WEIGHT_SCALE / sqrt(number of tags)), maintained
+    by community.signals for community.affinity
+    """
+    discussion = models.ForeignKey(Discussion, on_delete=models.CASCADE, related_name='tag_vector')
+    name = models.CharField(max_length=50)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ['discussion', 'name']
+        indexes = [
+            models.Index(fields=['name', 'discussion'], name='community_tag_name_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.discussion_id}: {self.name}"
+
 class Comment(models.Model):
     discussion = models.ForeignKey(Discussion, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='discussion_comments')
@@ -43,3 +62,27 @@ class Event(models.Model):
 
     def __str__(self):
         return self.title
+
+class CommunityStat(models.Model):
+    """
+    Community-wide counters (members, discussions, events, projects) kept
+    up to date by community.signals, so the hub summary never counts rows
+    """
+    key = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
+
+class ContributorStat(models.Model):
+    """Discussions created per user, for the top contributors list"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='contributor_stat')
+    posts_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-posts_count', 'user'], name='community_contributor_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email}: {self.posts_count} posts"
@@ -0,0 +1,40 @@
+"""
+Discussion search.
+
+On PostgreSQL every query word is prefix-matched against title and
+description (GIN tsvector index) OR the whole query against tags (GIN
+array index), and matches are ranked with ts_rank. Other databases fall
+back to substring matching with no rank.
+
+Matching rows are annotated with `search_rank`.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Cast
+from profiles.search import tokenize
+
+CONFIG = 'simple'
+
+
+def search_discussions(queryset, query):
+    if connection.vendor != 'postgresql':
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(tags__contains=[query])
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.filter(tags__contains=[query]).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    # Must match the expression of community_discussion_search_fts
+    vector = SearchVector('title', 'description', config=CONFIG)
+    tsquery = SearchQuery(' & '.join(f'{token}:*' for token in tokens), config=CONFIG, search_type='raw')
+
+    # ts_rank is float4; rank as float8 so cursor keys round-trip exactly
+    return queryset.annotate(
+        search=vector,
+        search_rank=Cast(SearchRank(vector, tsquery), FloatField()),
+    ).filter(Q(search=tsquery) | Q(tags__contains=[query]))
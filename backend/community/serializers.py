@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Discussion, Event, Comment
 from profiles.serializers import ProfileSerializer
+from .affinity import AffinityScorer
 
 class CommentSerializer(serializers.ModelSerializer):
     author_name = serializers.ReadOnlyField(source='author.profile.full_name')
@@ -15,8 +16,8 @@ class DiscussionSerializer(serializers.ModelSerializer):
     author_name = serializers.ReadOnlyField(source='author.profile.full_name')
     author_avatar = serializers.ReadOnlyField(source='author.profile.avatar')
     author_college = serializers.ReadOnlyField(source='author.profile.college')
-    likes_count = serializers.IntegerField(source='likes.count', read_only=True)
-    replies_count = serializers.IntegerField(source='comments.count', read_only=True)
+    likes_count = serializers.SerializerMethodField()
+    replies_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     match_score = serializers.SerializerMethodField()
     is_trending = serializers.SerializerMethodField()
@@ -32,20 +33,37 @@ class DiscussionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['author', 'created_at', 'likes_count', 'replies_count']
 
+    # DiscussionViewSet annotates likes_count, replies_count and is_liked;
+    # the fallbacks serve instances that weren't loaded through it
+
+    def get_likes_count(self, obj):
+        if hasattr(obj, 'likes_count'):
+            return obj.likes_count
+        return obj.likes.count()
+
+    def get_replies_count(self, obj):
+        if hasattr(obj, 'replies_count'):
+            return obj.replies_count
+        return obj.comments.count()
+
     def get_is_liked(self, obj):
+        if hasattr(obj, 'is_liked'):
+            return obj.is_liked
         user = self.context.get('request').user
         if user.is_authenticated:
             return obj.likes.filter(id=user.id).exists()
         return False
 
     def get_match_score(self, obj):
-        # SMART MODE: Basic mock match score logic
-        # In real implementation, compare user skills with discussion tags
-        return 90 # Placeholder
+        # SMART MODE: tag-to-skill affinity with the requester (0-100)
+        if 'affinity' not in self.context:
+            profile = getattr(self.context.get('request').user, 'profile', None)
+            self.context['affinity'] = AffinityScorer(profile.skill_names if profile else [])
+        return self.context['affinity'].score(obj.tags)
 
     def get_is_trending(self, obj):
         # Trending if > 5 likes or > 2 comments (arbitrary threshold for demo)
-        return obj.likes.count() > 5 or obj.comments.count() > 2
+        return self.get_likes_count(obj) > 5 or self.get_replies_count(obj) > 2
 
     def get_time_ago(self, obj):
         from django.utils.timesince import timesince
@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from profiles.models import Profile
+from .models import Discussion, Comment, Event
+from .cache import invalidate_feed, author_fields_changed
+from .affinity import index_discussion
+from .stats import CommunityStats, MEMBERS, DISCUSSIONS, EVENTS, PROJECTS, PROJECT_TAG
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Discussion)
+@receiver(post_delete, sender=Discussion)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_feed_on_change(sender, **kwargs):
+    invalidate_feed()
+
+
+@receiver(m2m_changed, sender=Discussion.likes.through)
+def invalidate_feed_on_like(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_feed()
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_feed_on_profile_change(sender, instance, **kwargs):
+    # Feed pages embed the author's name, avatar and college; only posters matter
+    if author_fields_changed(instance) and Discussion.objects.filter(author_id=instance.user_id).exists():
+        invalidate_feed()
+
+
+# Community statistics
+
+def is_project(tags):
+    return PROJECT_TAG in (tags or [])
+
+
+@receiver(post_save, sender=User)
+def count_member(sender, instance, created, **kwargs):
+    if created:
+        CommunityStats.add(MEMBERS, 1)
+
+
+@receiver(post_delete, sender=User)
+def uncount_member(sender, instance, **kwargs):
+    CommunityStats.add(MEMBERS, -1)
+
+
+@receiver(pre_save, sender=Discussion)
+def remember_discussion_state(sender, instance, **kwargs):
+    # Edits can change the tags (projects, tag vector) or the author
+    if instance.pk:
+        instance._before = Discussion.objects.filter(pk=instance.pk).values('author_id', 'tags').first()
+
+
+@receiver(post_save, sender=Discussion)
+def count_discussion(sender, instance, created, **kwargs):
+    if created:
+        CommunityStats.add(DISCUSSIONS, 1)
+        CommunityStats.add_posts(instance.author_id, 1)
+        if is_project(instance.tags):
+            CommunityStats.add(PROJECTS, 1)
+        return
+
+    before = getattr(instance, '_before', None)
+    if before is None:
+        return
+    if before['author_id'] != instance.author_id:
+        CommunityStats.add_posts(before['author_id'], -1)
+        CommunityStats.add_posts(instance.author_id, 1)
+    if is_project(before['tags']) != is_project(instance.tags):
+        CommunityStats.add(PROJECTS, 1 if is_project(instance.tags) else -1)
+
+
+@receiver(post_delete, sender=Discussion)
+def uncount_discussion(sender, instance, **kwargs):
+    CommunityStats.add(DISCUSSIONS, -1)
+    CommunityStats.add_posts(instance.author_id, -1)
+    if is_project(instance.tags):
+        CommunityStats.add(PROJECTS, -1)
+
+
+@receiver(post_save, sender=Discussion)
+def index_discussion_tags(sender, instance, created, **kwargs):
+    before = None if created else getattr(instance, '_before', None)
+    if before is None or before['tags'] != instance.tags:
+        index_discussion(instance.id, instance.tags)
+
+
+@receiver(post_save, sender=Event)
+def count_event(sender, instance, created, **kwargs):
+    if created:
+        CommunityStats.add(EVENTS, 1)
+
+
+@receiver(post_delete, sender=Event)
+def uncount_event(sender, instance, **kwargs):
+    CommunityStats.add(EVENTS, -1)
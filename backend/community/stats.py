@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction, IntegrityError
+from django.db.models import Count, F
+from .models import CommunityStat, ContributorStat, Discussion, Event
+
+User = get_user_model()
+
+MEMBERS = 'members'
+DISCUSSIONS = 'discussions'
+EVENTS = 'events'
+PROJECTS = 'projects'
+
+# Discussions with this tag count as started projects
+PROJECT_TAG = 'project'
+
+
+class CommunityStats:
+    """
+    Counters behind the community summary and top contributors, updated
+    incrementally from community.signals. Bulk writes bypass signals;
+    refresh() (manage.py refresh_community_stats) recounts everything.
+    """
+
+    @staticmethod
+    def _add(model, lookup, field, delta):
+        """Add delta to a counter row; rows are created on increment only and never go negative"""
+        rows = model.objects.filter(**lookup)
+        if delta < 0:
+            rows = rows.filter(**{f'{field}__gte': -delta})
+        updated = rows.update(**{field: F(field) + delta})
+        if updated or delta < 0:
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup, **{field: delta})
+        except IntegrityError:
+            # Created concurrently
+            model.objects.filter(**lookup).update(**{field: F(field) + delta})
+
+    @staticmethod
+    def add(key, delta):
+        CommunityStats._add(CommunityStat, {'key': key}, 'value', delta)
+
+    @staticmethod
+    def add_posts(user_id, delta):
+        CommunityStats._add(ContributorStat, {'user_id': user_id}, 'posts_count', delta)
+
+    @staticmethod
+    def summary():
+        """{key: value} of every counter, from one primary key lookup"""
+        values = dict(CommunityStat.objects.filter(
+            key__in=[MEMBERS, DISCUSSIONS, EVENTS, PROJECTS]
+        ).values_list('key', 'value'))
+        return {key: values.get(key, 0) for key in (MEMBERS, DISCUSSIONS, EVENTS, PROJECTS)}
+
+    @staticmethod
+    def top_contributors(limit=5):
+        """Users with the most discussions, with their profiles loaded"""
+        stats = ContributorStat.objects.filter(posts_count__gt=0).select_related(
+            'user__profile'
+        ).order_by('-posts_count', 'user')[:limit]
+        return [(stat.user, stat.posts_count) for stat in stats]
+
+    @staticmethod
+    @transaction.atomic
+    def refresh():
+        """Recount every counter from the tables"""
+        counts = {
+            MEMBERS: User.objects.count(),
+            DISCUSSIONS: Discussion.objects.count(),
+            EVENTS: Event.objects.count(),
+            PROJECTS: Discussion.objects.filter(tags__contains=[PROJECT_TAG]).count(),
+        }
+        for key, value in counts.items():
+            CommunityStat.objects.update_or_create(key=key, defaults={'value': value})
+
+        ContributorStat.objects.all().delete()
+        ContributorStat.objects.bulk_create([
+            ContributorStat(user_id=row['author_id'], posts_count=row['n'])
+            for row in Discussion.objects.order_by().values('author_id').annotate(n=Count('id'))
+        ], batch_size=1000)
+        return counts
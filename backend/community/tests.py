@@ -1,3 +1,204 @@
-from django.test import TestCase
+from unittest import skipUnless
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from connectx_backend.pagination import decode_cursor
+from .affinity import AffinityScorer, tag_vector, WEIGHT_SCALE
+from .models import CommunityStat, ContributorStat, Discussion, DiscussionTag, Event
+from .stats import CommunityStats, MEMBERS, DISCUSSIONS, EVENTS, PROJECTS
 
-# Create your tests here.
+User = get_user_model()
+
+postgres_only = skipUnless(connection.vendor == 'postgresql', 'needs PostgreSQL (connectx_backend.test_settings)')
+
+
+class AffinityTests(SimpleTestCase):
+    def test_tag_vector(self):
+        self.assertEqual(tag_vector([]), {})
+        self.assertEqual(tag_vector(None), {})
+        self.assertEqual(tag_vector(['Python']), {'python': WEIGHT_SCALE})
+        # Canonical, distinct names of unit length
+        self.assertEqual(tag_vector(['Python', ' python', 'SQL', '']), {'python': 707107, 'sql': 707107})
+        self.assertEqual(set(tag_vector(['a', 'b', 'c', 'd']).values()), {WEIGHT_SCALE // 2})
+
+    def test_score(self):
+        scorer = AffinityScorer(['Python', 'SQL'])
+        self.assertEqual(scorer.score(['sql', 'PYTHON']), 100)
+        self.assertEqual(scorer.score(['python']), 71)
+        self.assertEqual(scorer.score(['python', 'go']), 50)
+        self.assertEqual(scorer.score(['go', 'rust']), 0)
+        self.assertEqual(scorer.score([]), 0)
+        self.assertEqual(AffinityScorer([]).score(['python']), 0)
+        self.assertEqual(scorer.scores([['sql'], [], ['python', 'sql']]), [71, 0, 100])
+
+
+@postgres_only
+class RelevanceFeedTests(TestCase):
+    SKILLS = ['Python', 'SQL']
+    MATCHED_TAGS = [
+        ['python', 'sql'], ['python'], ['SQL', 'go'], ['python', 'go', 'rust'],
+        ['sql', 'python', 'react'], ['Python '], ['sql', 'docker', 'go', 'rust'],
+    ]
+    REST_TAGS = [['go'], [], ['react', 'design'], ['rust'], ['project']]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='me@example.com', username='me', password='x')
+        self.user.profile.set_skills(self.SKILLS)
+        self.user.profile.save()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        author = User.objects.create_user(email='author@example.com', username='author', password='x')
+        for i, tags in enumerate(self.MATCHED_TAGS + self.REST_TAGS):
+            Discussion.objects.create(title=f'd{i}', description='', author=author, tags=tags)
+
+    def expected_order(self):
+        scorer = AffinityScorer(self.SKILLS)
+        discussions = Discussion.objects.order_by('-created_at', '-id')
+        matched = sorted(
+            (d for d in discussions if scorer.score(d.tags)),
+            key=lambda d: (-scorer.score(d.tags), -d.id)
+        )
+        return [d.id for d in matched] + [d.id for d in discussions if not scorer.score(d.tags)]
+
+    def walk(self, limit):
+        """Ids of every page of the relevance feed, and the cursors followed"""
+        ids, cursors, cursor = [], [], ''
+        while True:
+            response = self.client.get(f'/api/community/discussions/?sort=relevance&limit={limit}&cursor={cursor}')
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['data']), limit)
+            ids += [item['id'] for item in response.data['data']]
+            cursor = response.data['pagination']['next']
+            if cursor is None:
+                return ids, cursors
+            cursors.append(decode_cursor(cursor)[0])
+
+    def test_matched_order_agrees_with_score(self):
+        scorer = AffinityScorer(self.SKILLS)
+        matched = list(scorer.matched(Discussion.objects.all()).order_by('-affinity', '-id'))
+        scores = [scorer.score(d.tags) for d in matched]
+        self.assertEqual(len(matched), len(self.MATCHED_TAGS))
+        self.assertTrue(all(scores))
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertFalse(any(scorer.score(d.tags) for d in scorer.unmatched(Discussion.objects.all())))
+
+    def test_feed_order(self):
+        for limit in (1, 2, 3, 5, 100):
+            ids, _ = self.walk(limit)
+            self.assertEqual(ids, self.expected_order(), f'limit {limit}')
+
+    def test_matched_tier_fills_last_page_exactly(self):
+        # 7 matched discussions: the first page ends exactly at the last of them
+        ids, cursors = self.walk(7)
+        self.assertEqual(ids, self.expected_order())
+        self.assertEqual(cursors[0], ['rest', None])
+
+    def test_match_score_field(self):
+        response = self.client.get('/api/community/discussions/?sort=relevance&limit=100')
+        scorer = AffinityScorer(self.SKILLS)
+        for item in response.data['data']:
+            self.assertEqual(item['match_score'], scorer.score(item['tags']))
+            self.assertNotIn('matchScore', item)
+
+    def test_tag_edit_reindexes(self):
+        discussion = Discussion.objects.get(title='d0')
+        discussion.tags = ['Go', 'go ', 'Rust']
+        discussion.save()
+
+        rows = DiscussionTag.objects.filter(discussion=discussion)
+        self.assertEqual(dict(rows.values_list('name', 'weight')), tag_vector(['go', 'rust']))
+        ids, _ = self.walk(100)
+        self.assertEqual(ids, self.expected_order())
+        # Now in the second tier
+        self.assertGreaterEqual(ids.index(discussion.id), len(self.MATCHED_TAGS) - 1)
+
+        # Saves that keep the tags leave the vector alone
+        row_ids = set(rows.values_list('id', flat=True))
+        discussion.title = 'renamed'
+        discussion.save()
+        self.assertEqual(set(rows.values_list('id', flat=True)), row_ids)
+
+
+@postgres_only
+class CommunityStatsTests(TestCase):
+    """The incremental counters always agree with a full recount"""
+
+    def assert_in_sync(self):
+        summary = CommunityStats.summary()
+        contributors = [(user.id, posts) for user, posts in CommunityStats.top_contributors(limit=100)]
+        self.assertEqual(CommunityStats.refresh(), summary)
+        self.assertEqual(CommunityStats.summary(), summary)
+        self.assertEqual([(user.id, posts) for user, posts in CommunityStats.top_contributors(limit=100)], contributors)
+        return summary
+
+    def test_counters(self):
+        users = [
+            User.objects.create_user(email=f'user{i}@example.com', username=f'user{i}', password='x')
+            for i in range(4)
+        ]
+        a, b, c, d = users
+        first = Discussion.objects.create(title='first', description='', author=a, tags=['python'])
+        project = Discussion.objects.create(title='project', description='', author=a, tags=['project'])
+        Discussion.objects.create(title='other', description='', author=b, tags=[])
+        event = Event.objects.create(title='meetup', organizer='x', date=timezone.now(), location='x', created_by=c)
+        Event.objects.create(title='hackathon', organizer='x', date=timezone.now(), location='x', created_by=c)
+        self.assertEqual(
+            self.assert_in_sync(),
+            {MEMBERS: 4, DISCUSSIONS: 3, EVENTS: 2, PROJECTS: 1}
+        )
+
+        # Author change moves the post
+        first.author = b
+        first.save()
+        self.assert_in_sync()
+
+        # Project tag added, then removed
+        first.tags = ['python', 'project']
+        first.save()
+        self.assertEqual(self.assert_in_sync()[PROJECTS], 2)
+        project.tags = ['done']
+        project.save()
+        self.assertEqual(self.assert_in_sync()[PROJECTS], 1)
+
+        # Author change and tag change in one save
+        project.author = c
+        project.tags = ['project']
+        project.save()
+        self.assertEqual(self.assert_in_sync()[PROJECTS], 2)
+
+        # Saves that change neither
+        project.title = 'renamed'
+        project.save()
+        self.assert_in_sync()
+
+        project.delete()
+        event.delete()
+        self.assertEqual(
+            self.assert_in_sync(),
+            {MEMBERS: 4, DISCUSSIONS: 2, EVENTS: 1, PROJECTS: 1}
+        )
+
+        # Deleting users removes their discussions and events too
+        Discussion.objects.create(title='last', description='', author=d, tags=['project'])
+        b.delete()
+        c.delete()
+        self.assertEqual(
+            self.assert_in_sync(),
+            {MEMBERS: 2, DISCUSSIONS: 1, EVENTS: 0, PROJECTS: 1}
+        )
+        self.assertEqual([(user.id, posts) for user, posts in CommunityStats.top_contributors()], [(d.id, 1)])
+
+    def test_counters_never_go_negative(self):
+        user = User.objects.create_user(email='me@example.com', username='me', password='x')
+        discussion = Discussion.objects.create(title='t', description='', author=user, tags=['project'])
+        CommunityStat.objects.all().delete()
+        ContributorStat.objects.all().delete()
+
+        discussion.delete()
+        self.assertEqual(CommunityStats.summary(), {MEMBERS: 0, DISCUSSIONS: 0, EVENTS: 0, PROJECTS: 0})
+        self.assertFalse(ContributorStat.objects.exists())
@@ -2,11 +2,19 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.db.models import Count, OuterRef, Subquery, Exists
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_datetime
+from django.utils.timesince import timesince
 from .models import Discussion, Event, Comment
 from .serializers import DiscussionSerializer, EventSerializer, CommentSerializer
 from profiles.models import Profile
+from connectx_backend.pagination import KeysetPaginator, InvalidCursor, decode_cursor, encode_cursor
+from .affinity import AffinityScorer
+from .cache import feed_version, get_cached_page, cache_page
+from .search import search_discussions
+from .stats import CommunityStats, MEMBERS, DISCUSSIONS, EVENTS, PROJECTS
 
 User = get_user_model()
 
@@ -18,19 +26,16 @@ def community_summary(request):
     Returns stats for the community hub header
     """
     try:
-        active_members = User.objects.count()
-        discussions_count = Discussion.objects.count()
-        events_count = Event.objects.count()
-        # Mocking projects count for now, or could link to another app
-        projects_count = Discussion.objects.filter(tags__contains=['project']).count()
+        # Counters maintained by community.signals (projects: discussions tagged 'project')
+        stats = CommunityStats.summary()
 
         return Response({
             'success': True,
             'data': {
-                'activeMembers': active_members,
-                'discussionsCount': discussions_count,
-                'eventsCount': events_count,
-                'projectsStarted': projects_count
+                'activeMembers': stats[MEMBERS],
+                'discussionsCount': stats[DISCUSSIONS],
+                'eventsCount': stats[EVENTS],
+                'projectsStarted': stats[PROJECTS]
             }
         })
     except Exception as e:
@@ -48,19 +53,23 @@ def top_contributors(request):
     """
     try:
         # Get top 5 users by number of discussions created
-        contributors = User.objects.annotate(
-            posts_count=Count('discussions')
-        ).order_by('-posts_count')[:5]
+        contributors = CommunityStats.top_contributors(5)
+        if len(contributors) < 5:
+            # Fill up with members who haven't posted yet
+            others = User.objects.exclude(
+                id__in=[user.id for user, _ in contributors]
+            ).select_related('profile')[:5 - len(contributors)]
+            contributors += [(user, 0) for user in others]
 
         data = []
-        for user in contributors:
+        for user, posts_count in contributors:
             # Get profile safely
             profile = getattr(user, 'profile', None)
             data.append({
                 'id': user.id,
                 'name': profile.full_name if profile else user.email.split('@')[0],
                 'college': profile.college if profile else 'Unknown',
-                'posts': user.posts_count,
+                'posts': posts_count,
                 'avatar': profile.avatar if profile else ''
             })
 
@@ -74,54 +83,215 @@ def top_contributors(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+FEED_PAGE_SIZE = 20
+MAX_FEED_PAGE_SIZE = 100
+SEARCH_MODES = ('recent', 'relevance')
+SORTS = ('recent', 'relevance')
+
+# Serialized per request on top of the shared feed page
+VIEWER_FIELDS = ('is_liked', 'time_ago', 'match_score')
+
+# Tiers of the relevance feed: discussions sharing a tag with the user's
+# skills by affinity, then all others newest first
+MATCHED = 'matched'
+REST = 'rest'
+
+
+def viewer_skills(user):
+    """Canonical skill names of the requester"""
+    profile = getattr(user, 'profile', None)
+    return profile.skill_names if profile else []
+
+
+def decode_relevance_cursor(cursor):
+    """(tier, keyset cursor within the tier) of a relevance feed cursor"""
+    key, _ = decode_cursor(cursor)
+    if len(key) != 2 or key[0] not in (MATCHED, REST) or not isinstance(key[1], (str, type(None))):
+        raise InvalidCursor('Invalid cursor')
+    # Relevance pages only go forward
+    if key[1] and decode_cursor(key[1])[1]:
+        raise InvalidCursor('Invalid cursor')
+    return key[0], key[1]
+
+
 class DiscussionViewSet(viewsets.ModelViewSet):
     queryset = Discussion.objects.all().order_by('-created_at')
     serializer_class = DiscussionSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        """
+        Discussions with their author profile, like/reply counts and the
+        requester's like flag, so serializing a page is a constant number
+        of queries
+        """
+        likes = Discussion.likes.through.objects.filter(discussion=OuterRef('pk'))
+        replies = Comment.objects.filter(discussion=OuterRef('pk'))
+        return super().get_queryset().select_related('author__profile').annotate(
+            likes_count=Coalesce(Subquery(
+                likes.order_by().values('discussion').annotate(n=Count('id')).values('n')
+            ), 0),
+            replies_count=Coalesce(Subquery(
+                replies.order_by().values('discussion').annotate(n=Count('id')).values('n')
+            ), 0),
+            is_liked=Exists(likes.filter(user_id=self.request.user.id)),
+        )
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        # Search & Filter
+        """
+        Latest discussions first, one page at a time over (created_at, id).
+
+        Query params:
+        - search: Words (prefix) in title or description, or an exact tag
+        - search_mode: 'recent' (default) or 'relevance' to rank search
+          results by text rank
+        - sort: 'recent' (default) or 'relevance' for discussions matching
+          the user's skills first, by tag affinity (next cursors only)
+        - limit: Page size (default 20, max 100)
+        - cursor: next/prev token from the previous response
+        """
         search_query = request.query_params.get('search', '')
-        if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) | 
-                Q(description__icontains=search_query) |
-                Q(tags__contains=[search_query])
+        search_mode = request.query_params.get('search_mode', 'recent')
+        if search_mode not in SEARCH_MODES:
+            return Response(
+                {'success': False, 'message': f"search_mode must be one of {', '.join(SEARCH_MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        sort = request.query_params.get('sort', 'recent')
+        if sort not in SORTS:
+            return Response(
+                {'success': False, 'message': f"sort must be one of {', '.join(SORTS)}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        if sort == 'relevance' and search_mode == 'relevance':
+            return Response(
+                {'success': False, 'message': 'Use either sort=relevance or search_mode=relevance'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        cursor = request.query_params.get('cursor') or None
+        try:
+            limit = int(request.query_params.get('limit', FEED_PAGE_SIZE))
+            if limit < 1:
+                raise ValueError('limit must be positive')
+        except ValueError as e:
+            return Response({'success': False, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, MAX_FEED_PAGE_SIZE)
 
-        # Basic serialization
-        serializer = self.get_serializer(queryset, many=True)
-        data = serializer.data
+        scorer = AffinityScorer(viewer_skills(request.user))
 
-        # SMART MODE: Calculate Match Score
-        # Improve this logic with real skill matching
-        user_skills = []
-        if hasattr(request.user, 'profile'):
-             user_skills = [s.lower() for s in request.user.profile.skills]
-        
-        for item in data:
-            discussion_tags = [t.lower() for t in item.get('tags', [])]
-            if not discussion_tags:
-                item['matchScore'] = 50 # Default if no tags
-                continue
-                
-            matches = sum(1 for tag in discussion_tags if tag in user_skills)
-            # Normalize: if 3 matches = 100%, 0 = 10%
-            score = min(100, max(10, int((matches / len(discussion_tags)) * 100) if user_skills else 40))
-            if matches > 0:
-                 score = min(100, score + 20) # Boost for any match
-            
-            item['matchScore'] = score
+        # The viewer-independent part of the page is shared between users
+        # (relevance pages between users with the same skills)
+        version = feed_version()
+        params = (search_query, search_mode, sort, cursor, limit)
+        if sort == 'relevance':
+            params += (tuple(sorted(scorer.skills)),)
+        page = get_cached_page(version, params)
+        if page is None:
+            try:
+                page = self.feed_page(search_query, search_mode, sort, scorer, cursor, limit)
+            except InvalidCursor as e:
+                return Response({'success': False, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            cache_page(version, params, *page)
+        items, pagination = page
 
         return Response({
             'success': True,
-            'data': data
+            'data': self.overlay_viewer_fields(request, items, scorer),
+            'pagination': pagination
         })
+
+    def feed_page(self, search_query, search_mode, sort, scorer, cursor, limit):
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = ('-created_at', '-id')
+
+        # Search & Filter (served by the full-text and tag indexes)
+        if search_query:
+            queryset = search_discussions(queryset, search_query)
+            if search_mode == 'relevance':
+                ordering = ('-search_rank', '-id')
+
+        if sort == 'relevance':
+            discussions, pagination = self.relevance_page(queryset, scorer, cursor, limit)
+        else:
+            page = KeysetPaginator(ordering, limit).paginate(queryset, cursor)
+            discussions = page.items
+            pagination = {
+                'limit': limit,
+                'next': page.next_cursor,
+                'prev': page.prev_cursor,
+                'hasNext': page.has_next,
+                'hasPrev': page.has_prev,
+            }
+
+        context = {**self.get_serializer_context(), 'affinity': scorer}
+        items = self.get_serializer(discussions, many=True, context=context).data
+        for item in items:
+            for field in VIEWER_FIELDS:
+                item.pop(field, None)
+        return items, pagination
+
+    def relevance_page(self, queryset, scorer, cursor, limit):
+        """
+        Page of the relevance feed: discussions sharing a tag with the
+        user's skills by affinity (from the tag vector index, so only the
+        matching discussions are ranked), followed by all others newest
+        first. Cursors name the tier and the keyset cursor within it.
+        """
+        tier, inner = decode_relevance_cursor(cursor) if cursor else (MATCHED, None)
+        discussions = []
+
+        if tier == MATCHED:
+            if scorer.skills:
+                page = KeysetPaginator(('-affinity', '-id'), limit).paginate(scorer.matched(queryset), inner)
+                discussions = page.items
+                if page.has_next:
+                    return discussions, self.relevance_pagination(limit, encode_cursor([MATCHED, page.next_cursor]), cursor)
+            tier, inner = REST, None
+
+        rest = scorer.unmatched(queryset) if scorer.skills else queryset
+        remaining = limit - len(discussions)
+        if not remaining:
+            # Page filled by the last matched discussions
+            next_cursor = encode_cursor([REST, None]) if rest.exists() else None
+            return discussions, self.relevance_pagination(limit, next_cursor, cursor)
+
+        page = KeysetPaginator(('-created_at', '-id'), remaining).paginate(rest, inner)
+        discussions += page.items
+        next_cursor = encode_cursor([REST, page.next_cursor]) if page.has_next else None
+        return discussions, self.relevance_pagination(limit, next_cursor, cursor)
+
+    def relevance_pagination(self, limit, next_cursor, cursor):
+        return {
+            'limit': limit,
+            'next': next_cursor,
+            'prev': None,
+            'hasNext': next_cursor is not None,
+            'hasPrev': cursor is not None,
+        }
+
+    def overlay_viewer_fields(self, request, items, scorer):
+        """
+        Adds is_liked, time_ago and match_score (tag affinity, scored for
+        the whole page in one batch) for the requester; one query for the
+        likes
+        """
+        liked = set(Discussion.likes.through.objects.filter(
+            user_id=request.user.id,
+            discussion_id__in=[item['id'] for item in items]
+        ).values_list('discussion_id', flat=True))
+        affinities = scorer.scores([item.get('tags', []) for item in items])
+
+        data = []
+        for item, affinity in zip(items, affinities):
+            item = dict(item)
+            item['is_liked'] = item['id'] in liked
+            item['time_ago'] = timesince(parse_datetime(item['created_at'])) + " ago"
+            item['match_score'] = affinity
+            data.append(item)
+        return data
         
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -0,0 +1,109 @@
+from django.db.models import Q
+from .models import ConnectionRequest
+
+# Backend status -> frontend status
+STATUS_MAP = {
+    'pending': 'pending',
+    'accepted': 'connected',
+    'rejected': 'not_connected',
+}
+
+
+class ConnectionService:
+    """
+    Service class for reading connection state in bulk
+    """
+    
+    @staticmethod
+    def get_status_map(user, user_ids):
+        """
+        Returns {user_id: status} between user and each of user_ids in a
+        single query. Users without a request are omitted. When requests
+        exist in both directions the most recent one wins, as with
+        ConnectionRequest.objects.filter(...).first().
+        """
+        requests = ConnectionRequest.objects.filter(
+            Q(sender=user, receiver_id__in=user_ids) |
+            Q(sender_id__in=user_ids, receiver=user)
+        ).values_list('sender_id', 'receiver_id', 'status')
+        
+        statuses = {}
+        for sender_id, receiver_id, status in requests:
+            other_id = receiver_id if sender_id == user.id else sender_id
+            statuses.setdefault(other_id, STATUS_MAP.get(status, 'not_connected'))
+        
+        return statuses
+
+
+class ConnectionGraph:
+    """
+    Cached adjacency lists of accepted connections.
+    
+    For each user the cache holds {'followers': [...], 'following': [...]}
+    (user ids, most recent first), where followers sent the accepted
+    request and following received it. Entries are dropped by the
+    ConnectionRequest signals whenever either side's requests change.
+    """
+    
+    TIMEOUT = 60 * 60
+    
+    @staticmethod
+    def _key(user_id):
+        return f'connections:graph:{user_id}'
+    
+    @staticmethod
+    def get(user_id):
+        return ConnectionGraph.get_many([user_id])[user_id]
+    
+    @staticmethod
+    def get_many(user_ids):
+        """Adjacency for each user id: one cache round trip plus at most one query"""
+        from django.core.cache import cache
+        
+        user_ids = list(dict.fromkeys(user_ids))
+        cached = cache.get_many([ConnectionGraph._key(user_id) for user_id in user_ids])
+        
+        graph = {}
+        missing = []
+        for user_id in user_ids:
+            adjacency = cached.get(ConnectionGraph._key(user_id))
+            if adjacency is None:
+                missing.append(user_id)
+            else:
+                graph[user_id] = adjacency
+        
+        if missing:
+            loaded = {user_id: {'followers': [], 'following': []} for user_id in missing}
+            accepted = ConnectionRequest.objects.filter(
+                Q(sender_id__in=missing) | Q(receiver_id__in=missing),
+                status='accepted'
+            ).values_list('sender_id', 'receiver_id')
+            
+            for sender_id, receiver_id in accepted:
+                if sender_id in loaded:
+                    loaded[sender_id]['following'].append(receiver_id)
+                if receiver_id in loaded:
+                    loaded[receiver_id]['followers'].append(sender_id)
+            
+            cache.set_many(
+                {ConnectionGraph._key(user_id): adjacency for user_id, adjacency in loaded.items()},
+                ConnectionGraph.TIMEOUT
+            )
+            graph.update(loaded)
+        
+        return graph
+    
+    @staticmethod
+    def connections(adjacency):
+        """All connected user ids, in either direction"""
+        return list(set(adjacency['following'] + adjacency['followers']))
+    
+    @staticmethod
+    def is_connected(user_id, other_user_id):
+        adjacency = ConnectionGraph.get(user_id)
+        return other_user_id in adjacency['following'] or other_user_id in adjacency['followers']
+    
+    @staticmethod
+    def invalidate(*user_ids):
+        from django.core.cache import cache
+        cache.delete_many([ConnectionGraph._key(user_id) for user_id in user_ids])
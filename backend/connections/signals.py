@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ConnectionRequest
+from .services import ConnectionGraph
+
+
+@receiver(post_save, sender=ConnectionRequest)
+@receiver(post_delete, sender=ConnectionRequest)
+def invalidate_connection_graph(sender, instance, **kwargs):
+    ConnectionGraph.invalidate(instance.sender_id, instance.receiver_id)
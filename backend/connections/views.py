@@ -5,11 +5,24 @@ from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 from .models import ConnectionRequest
+from .services import ConnectionGraph
+from chat.notifications import notify_users
 from .serializers import ConnectionRequestSerializer, ConnectionRequestCreateSerializer
 
 User = get_user_model()
 
 
+def notify_connection(user_id, event, connection_request):
+    """Push a connection event to the user's notification sockets"""
+    notify_users([user_id], 'connection', {
+        'event': event,
+        'request_id': connection_request.id,
+        'sender_id': connection_request.sender_id,
+        'receiver_id': connection_request.receiver_id,
+        'status': connection_request.status,
+    })
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def send_connection_request(request):
@@ -65,6 +78,8 @@ def send_connection_request(request):
             receiver=receiver
         )
     
+    notify_connection(receiver.id, 'request', connection_request)
+    
     return Response(
         ConnectionRequestSerializer(connection_request).data,
         status=status.HTTP_201_CREATED
@@ -97,6 +112,8 @@ def accept_connection_request(request):
     connection_request.status = 'accepted'
     connection_request.save()
     
+    notify_connection(connection_request.sender_id, 'accepted', connection_request)
+    
     return Response(
         ConnectionRequestSerializer(connection_request).data
     )
@@ -128,6 +145,8 @@ def reject_connection_request(request):
     connection_request.status = 'rejected'
     connection_request.save()
     
+    notify_connection(connection_request.sender_id, 'rejected', connection_request)
+    
     return Response(
         ConnectionRequestSerializer(connection_request).data
     )
@@ -136,27 +155,40 @@ def reject_connection_request(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_connection_requests(request):
+    profile_relations = (
+        'sender__profile', 'receiver__profile',
+    )
+    skill_relations = (
+        'sender__profile__profile_skills', 'receiver__profile__profile_skills',
+    )
+    
     # Get pending requests received by the user
-    received_requests = ConnectionRequest.objects.filter(
+    received_requests = list(ConnectionRequest.objects.filter(
         receiver=request.user,
         status='pending'
-    ).select_related('sender__profile')
+    ).select_related(*profile_relations).prefetch_related(*skill_relations))
     
     # Get all sent requests
-    sent_requests = ConnectionRequest.objects.filter(
+    sent_requests = list(ConnectionRequest.objects.filter(
         sender=request.user
-    ).select_related('receiver__profile')
+    ).select_related(*profile_relations).prefetch_related(*skill_relations))
     
     # Get accepted connections
-    accepted_connections = ConnectionRequest.objects.filter(
+    accepted_connections = list(ConnectionRequest.objects.filter(
         Q(sender=request.user) | Q(receiver=request.user),
         status='accepted'
-    ).select_related('sender__profile', 'receiver__profile')
+    ).select_related(*profile_relations).prefetch_related(*skill_relations))
+    
+    # Load the connection graph of every profile on the page at once
+    user_ids = set()
+    for connection_request in received_requests + sent_requests + accepted_connections:
+        user_ids.update((connection_request.sender_id, connection_request.receiver_id))
+    context = {'connection_graph': ConnectionGraph.get_many(user_ids)}
     
     return Response({
-        'received_pending': ConnectionRequestSerializer(received_requests, many=True).data,
-        'sent': ConnectionRequestSerializer(sent_requests, many=True).data,
-        'connections': ConnectionRequestSerializer(accepted_connections, many=True).data,
+        'received_pending': ConnectionRequestSerializer(received_requests, many=True, context=context).data,
+        'sent': ConnectionRequestSerializer(sent_requests, many=True, context=context).data,
+        'connections': ConnectionRequestSerializer(accepted_connections, many=True, context=context).data,
     })
 
 
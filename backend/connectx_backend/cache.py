@@ -0,0 +1,82 @@
+"""
+Key/value cache backends shared by the app caches (matching, chat access).
+
+Both expose get/get_many/set/set_many/delete/clear, so a cache can keep an
+in-process LRU, a shared Django cache, or both.
+"""
+import threading
+from collections import OrderedDict
+from django.core.cache import caches
+
+
+class LocalLRUBackend:
+    """In-process key/value store evicting the least recently used key"""
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+    
+    def get_many(self, keys):
+        with self._lock:
+            found = {}
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+            return found
+    
+    def set(self, key, value):
+        self.set_many({key: value})
+    
+    def set_many(self, mapping):
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+    
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
+
+
+class DjangoCacheBackend:
+    """Key/value store on top of a configured Django cache (shared between processes)"""
+    
+    def __init__(self, alias, timeout):
+        self.cache = caches[alias]
+        self.timeout = timeout
+    
+    def get(self, key):
+        return self.cache.get(key)
+    
+    def get_many(self, keys):
+        return self.cache.get_many(keys)
+    
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+    
+    def set_many(self, mapping):
+        self.cache.set_many(mapping, self.timeout)
+    
+    def delete(self, key):
+        self.cache.delete(key)
+    
+    def clear(self):
+        self.cache.clear()
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class PostgresOnlyRunSQL(migrations.RunSQL):
+    """
+    RunSQL that only executes on PostgreSQL. Used for indexes and
+    extensions Django cannot express portably, so SQLite development
+    databases can still migrate.
+    """
+    
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+    
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,142 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Pages are fetched with WHERE (k1, k2, ...) < (v1, v2, ...) on an ordering
+whose last field is unique, so the cost of a page does not depend on how
+deep it is. Cursors are opaque url-safe tokens carrying the boundary key
+and the direction.
+"""
+import base64
+import json
+from datetime import datetime
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        parsed = parse_datetime(value.get('dt', ''))
+        if parsed is None:
+            raise InvalidCursor('Invalid cursor')
+        return parsed
+    return value
+
+
+def encode_cursor(key, reverse=False):
+    payload = json.dumps({'k': [_encode_value(value) for value in key], 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Returns (key, reverse) for a token produced by encode_cursor"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = [_decode_value(value) for value in payload['k']]
+        reverse = bool(payload.get('r', False))
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise InvalidCursor('Invalid cursor')
+    return key, reverse
+
+
+def approximate_count(queryset):
+    """
+    Row estimate for queryset. Uses the planner's estimate on PostgreSQL
+    (no scan); other databases fall back to an exact COUNT(*).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, prev_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+    
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset over `ordering`, e.g. ('-updated_at', '-id').
+    The last ordering field must be unique. Fields may be annotations.
+    """
+    
+    def __init__(self, ordering, limit):
+        self.ordering = tuple(ordering)
+        self.limit = limit
+    
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+    
+    def _seek(self, ordering, key):
+        """Q selecting rows strictly after key in ordering"""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, key):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+    
+    def key_for(self, item):
+        return [getattr(item, field.lstrip('-')) for field in self.ordering]
+    
+    def cursor_for(self, item, reverse=False):
+        """Cursor for the page after (or, with reverse, before) item"""
+        return encode_cursor(self.key_for(item), reverse)
+    
+    def paginate(self, queryset, cursor=None):
+        key, reverse = decode_cursor(cursor) if cursor else (None, False)
+        if key is not None and len(key) != len(self.ordering):
+            raise InvalidCursor('Invalid cursor')
+        
+        ordering = tuple(self._flip(field) for field in self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if key is not None:
+            queryset = queryset.filter(self._seek(ordering, key))
+        
+        items = list(queryset[:self.limit + 1])
+        has_more = len(items) > self.limit
+        items = items[:self.limit]
+        
+        if reverse:
+            items.reverse()
+            has_prev, has_next = has_more, True
+        else:
+            has_prev, has_next = key is not None, has_more
+        
+        return KeysetPage(
+            items,
+            next_cursor=self.cursor_for(items[-1]) if has_next and items else None,
+            prev_cursor=self.cursor_for(items[0], reverse=True) if has_prev and items else None,
+        )
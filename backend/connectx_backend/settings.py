@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party
     'rest_framework',
@@ -93,6 +94,19 @@ RENDER_EXTERNAL_HOSTNAME = config('RENDER_EXTERNAL_HOSTNAME', default=None)
 if RENDER_EXTERNAL_HOSTNAME:
     ALLOWED_HOSTS.append(RENDER_EXTERNAL_HOSTNAME)
 
+# Cache (shared Redis cache in production, per-process memory otherwise)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+if config('REDIS_URL', default=None):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('REDIS_URL'),
+    }
+
 # Password validation
 # Password validation
 AUTH_PASSWORD_VALIDATORS = []
@@ -164,13 +178,60 @@ CORS_ALLOW_HEADERS = [
 ]
 
 # Channels
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
-        'CONFIG': {
-            "hosts": [config('REDIS_URL', default='redis://localhost:6379')],
+# CHANNEL_LAYER: 'redis' (required with more than one daphne process) or
+# 'memory' (single process only: local development and load tests)
+CHANNEL_LAYER = config('CHANNEL_LAYER', default='redis')
+
+if CHANNEL_LAYER == 'memory':
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
         },
-    },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                "hosts": [config('REDIS_URL', default='redis://localhost:6379')],
+            },
+        },
+    }
+
+# /api/auth/me response cache (seconds); 0 disables it
+AUTH_ME_CACHE_TIMEOUT = config('AUTH_ME_CACHE_TIMEOUT', default=30, cast=int)
+
+# Shared community feed page cache (seconds); 0 disables it
+COMMUNITY_FEED_CACHE_TIMEOUT = config('COMMUNITY_FEED_CACHE_TIMEOUT', default=60, cast=int)
+
+# Seconds a user stays online after their last socket connect or heartbeat
+PRESENCE_TIMEOUT = config('PRESENCE_TIMEOUT', default=90, cast=int)
+
+# Matching
+# BACKEND: 'locmem' (per-process LRU) or 'django' (CACHES['default'], shared across workers)
+MATCH_CACHE = {
+    'BACKEND': config('MATCH_CACHE_BACKEND', default='locmem'),
+    'MAX_ENTRIES': config('MATCH_CACHE_MAX_ENTRIES', default=10000, cast=int),
+    'TOP_K': 50,
+    'TIMEOUT': 3600,
+}
+
+# Chat socket authorization cache
+# SHARED also keeps room membership in CACHES['default'] for other workers
+CHAT_ACCESS_CACHE = {
+    'MAX_ENTRIES': config('CHAT_ACCESS_CACHE_MAX_ENTRIES', default=10000, cast=int),
+    'SHARED': config('CHAT_ACCESS_CACHE_SHARED', default=False, cast=bool),
+    'TIMEOUT': 3600,
+}
+
+# Chat write-behind: broadcast WebSocket messages immediately and save them
+# in batches of up to MAX_BATCH_SIZE, at most MAX_BATCH_AGE seconds later
+CHAT_WRITE_BEHIND = {
+    'ENABLED': config('CHAT_WRITE_BEHIND', default=False, cast=bool),
+    'MAX_BATCH_SIZE': config('CHAT_WRITE_BEHIND_MAX_BATCH_SIZE', default=50, cast=int),
+    'MAX_BATCH_AGE': config('CHAT_WRITE_BEHIND_MAX_BATCH_AGE', default=0.5, cast=float),
+    'RETRIES': config('CHAT_WRITE_BEHIND_RETRIES', default=2, cast=int),
+    'RETRY_DELAY': config('CHAT_WRITE_BEHIND_RETRY_DELAY', default=0.2, cast=float),
 }
 
 # Security Settings
@@ -0,0 +1,138 @@
+import hashlib
+import uuid
+from django.conf import settings
+from connectx_backend.cache import LocalLRUBackend, DjangoCacheBackend
+from .index import MatchIndex
+
+DEFAULT_MATCH_CACHE = {
+    'BACKEND': 'locmem',
+    'MAX_ENTRIES': 10000,
+    'TOP_K': 50,
+    'TIMEOUT': 3600,
+    'CACHE_ALIAS': 'default',
+}
+
+
+class MatchCache:
+    """
+    Per-user top-K match cache.
+    
+    Every index key (skill, college, year) has a version token. A cached
+    ranking records the tokens of its owner's keys at compute time and is
+    only served while all of them are unchanged. Any candidate that can
+    appear in a ranking shares at least one key with its owner, so when a
+    profile's match or display fields change, replacing the tokens of its
+    old and new keys invalidates exactly the rankings it could be part of.
+    """
+    
+    def __init__(self, backend, top_k):
+        self.backend = backend
+        self.top_k = top_k
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _entry_key(profile_id):
+        return f'match:top:{profile_id}'
+    
+    @staticmethod
+    def _fingerprint_key(profile_id):
+        return f'match:fp:{profile_id}'
+    
+    @staticmethod
+    def _token_key(index_key):
+        kind, value = index_key
+        return f'match:token:{kind}:{hashlib.md5(value.encode()).hexdigest()}'
+    
+    @staticmethod
+    def _fingerprint(profile):
+        """Hash of every profile field that shows up in someone else's match list"""
+        fields = (
+            profile.full_name, profile.college, profile.year, profile.skills,
+            profile.bio, profile.city, profile.state,
+        )
+        return hashlib.md5(repr(fields).encode()).hexdigest()
+    
+    def get_matches(self, user_profile, limit):
+        """Returns find_matches(user_profile, limit), served from cache when still valid"""
+        from .services import MatchingService
+        
+        if limit > self.top_k:
+            self.misses += 1
+            return MatchingService.find_matches(user_profile, limit=limit)
+        
+        entry = self.backend.get(self._entry_key(user_profile.id))
+        if entry is not None:
+            current = self.backend.get_many(list(entry['tokens']))
+            if current == entry['tokens']:
+                self.hits += 1
+                return entry['matches'][:limit]
+        
+        self.misses += 1
+        
+        # Read tokens before computing so a concurrent edit invalidates the result
+        token_keys = [self._token_key(key) for key in MatchIndex.keys_for(user_profile)]
+        tokens = self.backend.get_many(token_keys)
+        missing = {key: uuid.uuid4().hex for key in token_keys if key not in tokens}
+        if missing:
+            self.backend.set_many(missing)
+            tokens.update(missing)
+        
+        matches = MatchingService.find_matches(user_profile, limit=self.top_k)
+        self.backend.set(self._entry_key(user_profile.id), {
+            'tokens': tokens,
+            'matches': matches,
+        })
+        
+        return matches[:limit]
+    
+    def invalidate_keys(self, index_keys):
+        """Invalidate every cached ranking whose owner has one of index_keys"""
+        if index_keys:
+            self.backend.set_many({self._token_key(key): uuid.uuid4().hex for key in index_keys})
+    
+    def profile_changed(self, profile, index_keys):
+        """
+        Called after a profile save with the union of its old and new index
+        keys. Saves that leave every match-visible field untouched (e.g. a
+        last_login update propagated from the User) keep the cache warm.
+        """
+        fingerprint = self._fingerprint(profile)
+        fingerprint_key = self._fingerprint_key(profile.id)
+        
+        if self.backend.get(fingerprint_key) == fingerprint:
+            return
+        
+        self.invalidate_keys(index_keys)
+        self.backend.set(fingerprint_key, fingerprint)
+    
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'top_k': self.top_k,
+        }
+
+
+_match_cache = None
+
+
+def get_match_cache():
+    """Process-wide MatchCache configured from settings.MATCH_CACHE"""
+    global _match_cache
+    
+    if _match_cache is None:
+        options = {**DEFAULT_MATCH_CACHE, **getattr(settings, 'MATCH_CACHE', {})}
+        
+        if options['BACKEND'] == 'django':
+            backend = DjangoCacheBackend(options['CACHE_ALIAS'], options['TIMEOUT'])
+        elif options['BACKEND'] == 'locmem':
+            backend = LocalLRUBackend(options['MAX_ENTRIES'])
+        else:
+            raise ValueError(f"Unknown MATCH_CACHE backend: {options['BACKEND']}")
+        
+        _match_cache = MatchCache(backend, options['TOP_K'])
+    
+    return _match_cache
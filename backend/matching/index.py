@@ -0,0 +1,101 @@
+from django.db import transaction
+from django.db.models import Q
+from profiles.models import Profile
+from .models import MatchIndexEntry
+
+VALUE_MAX_LENGTH = MatchIndexEntry._meta.get_field('value').max_length
+
+
+def index_keys(skills, college, year):
+    """
+    Returns the set of (kind, value) keys a profile is indexed under.
+    Normalization mirrors MatchingService so that every profile with a
+    non-zero match percentage shares at least one key with the user.
+    """
+    keys = set()
+    if skills:
+        for skill in skills:
+            keys.add((MatchIndexEntry.SKILL, skill.lower().strip()[:VALUE_MAX_LENGTH]))
+    keys.add((MatchIndexEntry.COLLEGE, (college or '').lower()[:VALUE_MAX_LENGTH]))
+    keys.add((MatchIndexEntry.YEAR, (year or '')[:VALUE_MAX_LENGTH]))
+    return keys
+
+
+class MatchIndex:
+    """
+    Incrementally maintained skill/college/year -> profile inverted index
+    used to generate match candidates without scanning every Profile
+    """
+    
+    @staticmethod
+    def keys_for(profile):
+        return index_keys(profile.skills, profile.college, profile.year)
+    
+    @staticmethod
+    def update_profile(profile):
+        """
+        Sync the index rows of a single profile with its current fields.
+        Only the changed keys are written. Returns (old_keys, new_keys).
+        """
+        new_keys = MatchIndex.keys_for(profile)
+        old_keys = set(
+            MatchIndexEntry.objects.filter(profile=profile).values_list('kind', 'value')
+        )
+        
+        removed = old_keys - new_keys
+        added = new_keys - old_keys
+        
+        if removed or added:
+            with transaction.atomic():
+                if removed:
+                    stale = Q()
+                    for kind, value in removed:
+                        stale |= Q(kind=kind, value=value)
+                    MatchIndexEntry.objects.filter(stale, profile=profile).delete()
+                if added:
+                    MatchIndexEntry.objects.bulk_create(
+                        [MatchIndexEntry(profile=profile, kind=kind, value=value) for kind, value in added],
+                        ignore_conflicts=True
+                    )
+        
+        return old_keys, new_keys
+    
+    @staticmethod
+    def candidates(user_profile):
+        """
+        Profiles sharing at least one indexed key with user_profile,
+        excluding the user themselves, in primary key order
+        """
+        lookup = Q()
+        for kind, value in MatchIndex.keys_for(user_profile):
+            lookup |= Q(kind=kind, value=value)
+        
+        candidate_ids = MatchIndexEntry.objects.filter(lookup).values('profile_id')
+        
+        return (
+            Profile.objects
+            .filter(id__in=candidate_ids)
+            .exclude(user=user_profile.user)
+            .select_related('user')
+            .prefetch_related('profile_skills')
+            .order_by('id')
+        )
+    
+    @staticmethod
+    def rebuild(batch_size=1000):
+        """Drop and rebuild the whole index from the Profile table"""
+        with transaction.atomic():
+            MatchIndexEntry.objects.all().delete()
+            
+            entries = []
+            profiles = Profile.objects.only('id', 'college', 'year').prefetch_related('profile_skills')
+            for profile in profiles.iterator(chunk_size=batch_size):
+                for kind, value in MatchIndex.keys_for(profile):
+                    entries.append(MatchIndexEntry(profile_id=profile.id, kind=kind, value=value))
+                
+                if len(entries) >= batch_size:
+                    MatchIndexEntry.objects.bulk_create(entries)
+                    entries = []
+            
+            if entries:
+                MatchIndexEntry.objects.bulk_create(entries)
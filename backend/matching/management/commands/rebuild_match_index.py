@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from matching.index import MatchIndex
+from matching.models import MatchIndexEntry
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the skill/college/year match index from all profiles'
+    
+    def handle(self, *args, **options):
+        MatchIndex.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Match index rebuilt ({MatchIndexEntry.objects.count()} entries)'
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('profiles', '0002_profile_avatar_profile_headline_profile_is_online_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('skill', 'Skill'), ('college', 'College'), ('year', 'Year')], max_length=10)),
+                ('value', models.CharField(blank=True, max_length=255)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_index_entries', to='profiles.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'value'], name='matching_index_lookup_idx')],
+                'unique_together': {('profile', 'kind', 'value')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def backfill_match_index(apps, schema_editor):
+    from matching.index import index_keys
+    
+    Profile = apps.get_model('profiles', 'Profile')
+    MatchIndexEntry = apps.get_model('matching', 'MatchIndexEntry')
+    
+    entries = []
+    for profile in Profile.objects.only('id', 'skills', 'college', 'year').iterator(chunk_size=1000):
+        for kind, value in index_keys(profile.skills, profile.college, profile.year):
+            entries.append(MatchIndexEntry(profile_id=profile.id, kind=kind, value=value))
+        
+        if len(entries) >= 1000:
+            MatchIndexEntry.objects.bulk_create(entries)
+            entries = []
+    
+    if entries:
+        MatchIndexEntry.objects.bulk_create(entries)
+
+
+def clear_match_index(apps, schema_editor):
+    MatchIndexEntry = apps.get_model('matching', 'MatchIndexEntry')
+    MatchIndexEntry.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_match_index, clear_match_index),
+    ]
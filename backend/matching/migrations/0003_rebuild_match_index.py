@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def rebuild_match_index(apps, schema_editor):
+    from matching.index import index_keys
+    
+    Profile = apps.get_model('profiles', 'Profile')
+    ProfileSkill = apps.get_model('profiles', 'ProfileSkill')
+    MatchIndexEntry = apps.get_model('matching', 'MatchIndexEntry')
+    
+    labels = {}
+    for profile_id, label in ProfileSkill.objects.order_by('profile_id', 'position').values_list('profile_id', 'label'):
+        labels.setdefault(profile_id, []).append(label)
+    
+    MatchIndexEntry.objects.all().delete()
+    
+    entries = []
+    for profile_id, college, year in Profile.objects.values_list('id', 'college', 'year').iterator():
+        for kind, value in index_keys(labels.get(profile_id, []), college, year):
+            entries.append(MatchIndexEntry(profile_id=profile_id, kind=kind, value=value))
+    
+    MatchIndexEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0002_backfill_match_index'),
+        ('profiles', '0005_remove_profile_skills'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_match_index, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,31 @@
 from django.db import models
+from profiles.models import Profile
 
-# No models needed for matching - it's a service layer
+
+class MatchIndexEntry(models.Model):
+    """
+    Inverted index row mapping a normalized match signal (skill, college
+    or year) to a profile. Maintained from Profile saves so the matcher
+    only has to look at profiles sharing at least one signal.
+    """
+    SKILL = 'skill'
+    COLLEGE = 'college'
+    YEAR = 'year'
+    KIND_CHOICES = [
+        (SKILL, 'Skill'),
+        (COLLEGE, 'College'),
+        (YEAR, 'Year'),
+    ]
+    
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='match_index_entries')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    value = models.CharField(max_length=255, blank=True)
+    
+    class Meta:
+        unique_together = ['profile', 'kind', 'value']
+        indexes = [
+            models.Index(fields=['kind', 'value'], name='matching_index_lookup_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind}:{self.value} -> {self.profile_id}"
@@ -1,4 +1,4 @@
-from profiles.models import Profile
+from .index import MatchIndex
 
 
 class MatchingService:
@@ -69,16 +69,16 @@ class MatchingService:
         """
         Find and return matching profiles sorted by match percentage
         """
-        # Get all profiles except the user's own
-        all_profiles = Profile.objects.exclude(user=user_profile.user).select_related('user')
+        from .scoring import BatchScorer
+        
+        # Only profiles sharing a skill, college or year can score above 0
+        candidates = list(MatchIndex.candidates(user_profile))
+        
+        # Score the whole candidate set in one batch pass
+        percentages = BatchScorer(user_profile).score(candidates)
         
         matches = []
-        for candidate in all_profiles:
-            match_percentage = MatchingService.calculate_match_percentage(
-                user_profile,
-                candidate
-            )
-            
+        for candidate, match_percentage in zip(candidates, percentages):
             if match_percentage > 0:
                 matches.append({
                     'user_id': candidate.user.id,
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from profiles.models import Profile
+from .cache import get_match_cache
+from .index import MatchIndex
+
+
+@receiver(post_save, sender=Profile)
+def update_match_index(sender, instance, **kwargs):
+    old_keys, new_keys = MatchIndex.update_profile(instance)
+    get_match_cache().profile_changed(instance, old_keys | new_keys)
+
+
+@receiver(post_delete, sender=Profile)
+def invalidate_deleted_profile(sender, instance, **kwargs):
+    get_match_cache().invalidate_keys(MatchIndex.keys_for(instance))
@@ -0,0 +1,70 @@
+import random
+from types import SimpleNamespace
+from django.test import SimpleTestCase
+from .scoring import BatchScorer, SkillVocabulary
+from .services import MatchingService
+
+SKILLS = ['Python', 'python ', ' PYTHON', 'React', 'react', 'SQL', 'Go', 'Machine Learning', 'machine learning', ' ', '']
+COLLEGES = ['MIT', 'mit', 'Stanford', 'IIT Delhi', '']
+YEARS = ['1', '2', '3', '4', '']
+
+
+def random_profile(rng):
+    return SimpleNamespace(
+        skills=rng.sample(SKILLS, rng.randint(0, 5)),
+        college=rng.choice(COLLEGES),
+        year=rng.choice(YEARS),
+    )
+
+
+class BatchScorerTests(SimpleTestCase):
+    """BatchScorer must score exactly like MatchingService.calculate_match_percentage"""
+
+    def assert_same_scores(self, user, candidates, vocabulary=None):
+        expected = [MatchingService.calculate_match_percentage(user, candidate) for candidate in candidates]
+        self.assertEqual(BatchScorer(user, vocabulary).score(candidates), expected)
+
+    def test_random_corpora(self):
+        rng = random.Random(20240501)
+        # One vocabulary across corpora, as the match index shares it
+        vocabulary = SkillVocabulary()
+        for _ in range(300):
+            user = random_profile(rng)
+            candidates = [random_profile(rng) for _ in range(rng.randint(0, 20))]
+            self.assert_same_scores(user, candidates, vocabulary)
+
+    def test_empty_skills(self):
+        user = SimpleNamespace(skills=[], college='MIT', year='2')
+        candidates = [
+            SimpleNamespace(skills=[], college='MIT', year='2'),
+            SimpleNamespace(skills=['Python'], college='mit', year='2'),
+            SimpleNamespace(skills=['Python'], college='', year=''),
+        ]
+        self.assert_same_scores(user, candidates)
+        self.assert_same_scores(candidates[1], [user])
+
+    def test_case_and_whitespace_variants(self):
+        user = SimpleNamespace(skills=['Python', ' React '], college='MIT', year='3')
+        candidate = SimpleNamespace(skills=['python', 'REACT'], college='mit', year='3')
+        self.assert_same_scores(user, [candidate])
+        self.assertEqual(BatchScorer(user).score([candidate]), [100])
+
+    def test_empty_college_and_year(self):
+        user = SimpleNamespace(skills=['Go'], college='', year='')
+        candidates = [
+            SimpleNamespace(skills=['Go'], college='', year=''),
+            SimpleNamespace(skills=['Go'], college='MIT', year=''),
+            SimpleNamespace(skills=['go', 'SQL'], college='', year='1'),
+        ]
+        self.assert_same_scores(user, candidates)
+
+    def test_skill_percentages(self):
+        rng = random.Random(7)
+        for _ in range(100):
+            user = random_profile(rng)
+            candidates = [random_profile(rng) for _ in range(10)]
+            expected = [
+                round(MatchingService.calculate_skill_match(user.skills, candidate.skills) * 100)
+                for candidate in candidates
+            ]
+            self.assertEqual(BatchScorer(user).skill_percentages(candidates), expected)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import find_matches
+from .views import find_matches, match_cache_stats
 
 urlpatterns = [
     path('', find_matches, name='find_matches'),
+    path('cache-stats', match_cache_stats, name='match_cache_stats'),
 ]
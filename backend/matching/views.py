@@ -1,9 +1,9 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from profiles.models import Profile
-from .services import MatchingService
+from .cache import get_match_cache
 
 
 @api_view(['POST'])
@@ -20,10 +20,16 @@ def find_matches(request):
             )
         
         # Get limit from request, default to 50
-        limit = request.data.get('limit', 50)
+        try:
+            limit = int(request.data.get('limit', 50))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Find matches
-        matches = MatchingService.find_matches(user_profile, limit=limit)
+        # Find matches (served from the top-K cache when nothing relevant changed)
+        matches = get_match_cache().get_matches(user_profile, limit)
         
         return Response({
             'count': len(matches),
@@ -35,3 +41,13 @@ def find_matches(request):
             {'error': 'Profile not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def match_cache_stats(request):
+    """
+    GET /api/match/cache-stats
+    Returns hit/miss counters of this process's match cache
+    """
+    return Response(get_match_cache().stats())
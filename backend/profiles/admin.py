@@ -1,10 +1,16 @@
 from django.contrib import admin
-from .models import Profile
+from .models import Profile, Skill
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ['name']
+    search_fields = ['name']
 
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'first_name', 'last_name', 'college', 'year', 'city', 'created_at']
     list_filter = ['college', 'year', 'city', 'state']
-    search_fields = ['first_name', 'last_name', 'user__email', 'college', 'skills']
+    search_fields = ['first_name', 'last_name', 'user__email', 'college', 'skill_set__name']
     readonly_fields = ['created_at', 'updated_at']
@@ -0,0 +1,103 @@
+import ast
+import json
+
+from django.db import migrations
+
+
+def parse_array_literal(raw):
+    """Elements of a Postgres array literal such as {Python,"Machine Learning"}"""
+    items = []
+    item, quoted, in_quotes, escaped = [], False, False, False
+    for char in raw[1:-1]:
+        if escaped:
+            item.append(char)
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '"':
+            in_quotes = not in_quotes
+            quoted = True
+        elif char == ',' and not in_quotes:
+            items.append((''.join(item), quoted))
+            item, quoted = [], False
+        else:
+            item.append(char)
+    items.append((''.join(item), quoted))
+    # Unquoted NULL is a null element
+    return [value for value, quoted in items if quoted or value.strip().upper() != 'NULL']
+
+
+def parse_legacy_skills(raw):
+    """
+    The old TextField held a JSON list, a Python list repr, a Postgres
+    array literal or a comma-separated string
+    """
+    raw = (raw or '').strip()
+    if not raw:
+        return []
+    
+    if raw.startswith('{') and raw.endswith('}'):
+        return parse_array_literal(raw)
+    
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            value = parse(raw)
+        except (ValueError, SyntaxError):
+            continue
+        if isinstance(value, (list, tuple)):
+            return [str(item) for item in value]
+        break
+    
+    return raw.split(',')
+
+
+def migrate_skills(apps, schema_editor):
+    Profile = apps.get_model('profiles', 'Profile')
+    Skill = apps.get_model('profiles', 'Skill')
+    ProfileSkill = apps.get_model('profiles', 'ProfileSkill')
+    
+    profile_labels = {}
+    for profile_id, raw in Profile.objects.values_list('id', 'skills').iterator():
+        cleaned = {}
+        for label in parse_legacy_skills(raw):
+            label = label.strip()[:100]
+            name = label.lower().strip()
+            if name and name not in cleaned:
+                cleaned[name] = label
+        if cleaned:
+            profile_labels[profile_id] = cleaned
+    
+    names = set()
+    for cleaned in profile_labels.values():
+        names.update(cleaned)
+    Skill.objects.bulk_create([Skill(name=name) for name in names], ignore_conflicts=True)
+    skill_ids = dict(Skill.objects.values_list('name', 'id'))
+    
+    ProfileSkill.objects.bulk_create([
+        ProfileSkill(profile_id=profile_id, skill_id=skill_ids[name], label=label, position=position)
+        for profile_id, cleaned in profile_labels.items()
+        for position, (name, label) in enumerate(cleaned.items())
+    ], batch_size=1000)
+
+
+def restore_skills(apps, schema_editor):
+    Profile = apps.get_model('profiles', 'Profile')
+    ProfileSkill = apps.get_model('profiles', 'ProfileSkill')
+    
+    labels = {}
+    for profile_id, label in ProfileSkill.objects.order_by('profile_id', 'position').values_list('profile_id', 'label'):
+        labels.setdefault(profile_id, []).append(label)
+    
+    for profile_id, profile_labels in labels.items():
+        Profile.objects.filter(id=profile_id).update(skills=json.dumps(profile_labels))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_skill_profileskill'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrate_skills, restore_skills),
+    ]
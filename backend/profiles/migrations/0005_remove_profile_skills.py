@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:46
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_migrate_skills_to_skill_table'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='profile',
+            name='skills',
+        ),
+    ]
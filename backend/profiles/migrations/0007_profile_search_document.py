@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:50
+
+from django.db import migrations, models
+from connectx_backend.db import PostgresOnlyRunSQL
+
+
+def build_search_documents(apps, schema_editor):
+    Profile = apps.get_model('profiles', 'Profile')
+    ProfileSkill = apps.get_model('profiles', 'ProfileSkill')
+    
+    labels = {}
+    for profile_id, label in ProfileSkill.objects.order_by('profile_id', 'position').values_list('profile_id', 'label'):
+        labels.setdefault(profile_id, []).append(label)
+    
+    profiles = []
+    for profile in Profile.objects.only('id', 'first_name', 'last_name', 'headline').iterator():
+        parts = [profile.first_name, profile.last_name, profile.headline, *labels.get(profile.id, [])]
+        profile.search_document = ' '.join(part for part in parts if part)
+        profiles.append(profile)
+    
+    Profile.objects.bulk_update(profiles, ['search_document'], batch_size=1000)
+
+
+def create_trigram_index(apps, schema_editor):
+    """Trigram fallback index, only where the pg_trgm extension can be installed"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm;')
+    schema_editor.execute(
+        'CREATE INDEX profiles_search_document_trgm ON profiles_profile '
+        'USING gin (search_document gin_trgm_ops);'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS profiles_search_document_trgm;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_profile_updated_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+        # Expressions must match what profiles.search generates
+        PostgresOnlyRunSQL(
+            "CREATE INDEX profiles_search_document_fts ON profiles_profile "
+            "USING gin (to_tsvector('simple'::regconfig, COALESCE(search_document, '')));",
+            'DROP INDEX IF EXISTS profiles_search_document_fts;',
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,9 +1,21 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
+class Skill(models.Model):
+    """A skill under its canonical (stripped, lowercased) name"""
+    name = models.CharField(max_length=100, unique=True)
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def canonical_name(label):
+        return label.lower().strip()
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     
@@ -23,10 +35,13 @@ class Profile(models.Model):
     state = models.CharField(max_length=100, blank=True)
     
     # Skills & Links
-    skills = models.TextField(blank=True)  # Store as JSON string
+    skill_set = models.ManyToManyField(Skill, through='ProfileSkill', related_name='profiles', blank=True)
     linkedin_url = models.URLField(blank=True)
     github_url = models.URLField(blank=True)
     
+    # Denormalized names, headline and skills for people search
+    search_document = models.TextField(blank=True, editable=False)
+    
     # Online Status (for network discovery)
     is_online = models.BooleanField(default=False)
     
@@ -34,9 +49,23 @@ class Profile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Keyset pagination of the network page
+            models.Index(fields=['-updated_at', '-id'], name='profiles_updated_id_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.full_name} ({self.user.email})"
     
+    def save(self, *args, **kwargs):
+        self.search_document = self.build_search_document()
+        super().save(*args, **kwargs)
+    
+    def build_search_document(self):
+        skills = self.skills if self.pk else []
+        return ' '.join(part for part in [self.first_name, self.last_name, self.headline, *skills] if part)
+    
     @property
     def full_name(self):
         """Returns full name or email if name fields are empty"""
@@ -53,3 +82,62 @@ class Profile(models.Model):
     def title(self):
         """Returns headline as title for frontend compatibility"""
         return self.headline if self.headline else ""
+    
+    @property
+    def skills(self):
+        """Skill labels as entered by the user, in order (use prefetch_related('profile_skills') for lists)"""
+        return [profile_skill.label for profile_skill in self.profile_skills.all()]
+    
+    @property
+    def skill_names(self):
+        """Canonical skill names, matching Skill.name"""
+        return [Skill.canonical_name(label) for label in self.skills]
+    
+    def set_skills(self, labels):
+        """
+        Replace this profile's skills. Labels are deduplicated by canonical
+        name and blank entries dropped. Call before save() so post_save
+        receivers (match index) see the new skills.
+        """
+        max_length = Skill._meta.get_field('name').max_length
+        
+        cleaned = {}
+        for label in labels:
+            label = str(label).strip()[:max_length]
+            name = Skill.canonical_name(label)
+            if name and name not in cleaned:
+                cleaned[name] = label
+        
+        with transaction.atomic():
+            Skill.objects.bulk_create(
+                [Skill(name=name) for name in cleaned],
+                ignore_conflicts=True
+            )
+            skill_ids = dict(Skill.objects.filter(name__in=cleaned).values_list('name', 'id'))
+            
+            self.profile_skills.all().delete()
+            ProfileSkill.objects.bulk_create([
+                ProfileSkill(profile=self, skill_id=skill_ids[name], label=label, position=position)
+                for position, (name, label) in enumerate(cleaned.items())
+            ])
+        
+        # Drop any stale prefetched rows
+        getattr(self, '_prefetched_objects_cache', {}).pop('profile_skills', None)
+
+
+class ProfileSkill(models.Model):
+    """Through model linking a profile to a canonical skill, keeping the user's label and order"""
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='profile_skills')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='profile_skills')
+    label = models.CharField(max_length=100)
+    position = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['profile', 'skill']
+        ordering = ['position']
+        indexes = [
+            models.Index(fields=['skill', 'profile'], name='profiles_skill_profile_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.profile_id}: {self.label}"
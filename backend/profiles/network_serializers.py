@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.db.models import Q
 from .models import Profile
+from .presence import PresenceService
 from connections.models import ConnectionRequest
+from matching.scoring import BatchScorer
 
 
 class NetworkUserSerializer(serializers.ModelSerializer):
@@ -17,7 +19,7 @@ class NetworkUserSerializer(serializers.ModelSerializer):
     
     # Profile fields with frontend naming
     profileImage = serializers.CharField(source='avatar', read_only=True)
-    isOnline = serializers.BooleanField(source='is_online', read_only=True)
+    isOnline = serializers.SerializerMethodField()
     
     # Social links
     github = serializers.URLField(source='github_url', read_only=True)
@@ -49,6 +51,13 @@ class NetworkUserSerializer(serializers.ModelSerializer):
         """Returns full name"""
         return obj.name
     
+    def get_isOnline(self, obj):
+        """Live presence from the WebSocket connections, not the is_online column"""
+        online = self.context.get('online')
+        if online is not None:
+            return online.get(obj.user_id, False)
+        return PresenceService.is_online(obj.user_id)
+    
     def get_connectionStatus(self, obj):
         """
         Returns connection status between logged-in user and this user
@@ -59,9 +68,14 @@ class NetworkUserSerializer(serializers.ModelSerializer):
             return "not_connected"
         
         # Don't check connection with self
-        if obj.user.id == request.user.id:
+        if obj.user_id == request.user.id:
             return "not_connected"
         
+        # Statuses preloaded by the view for the whole page
+        statuses = self.context.get('connection_statuses')
+        if statuses is not None:
+            return statuses.get(obj.user_id, 'not_connected')
+        
         # Check for existing connection request
         connection = ConnectionRequest.objects.filter(
             Q(sender=request.user, receiver=obj.user) |
@@ -90,25 +104,15 @@ class NetworkUserSerializer(serializers.ModelSerializer):
         if not include_match_score or not request or not request.user.is_authenticated:
             return None
         
+        # Scores batch-computed by the view for the whole page
+        match_scores = self.context.get('match_scores')
+        if match_scores is not None:
+            return match_scores.get(obj.user_id, 0)
+        
         try:
-            # Get logged-in user's profile
             current_profile = request.user.profile
-            current_skills = set(skill.lower() for skill in current_profile.skills)
-            target_skills = set(skill.lower() for skill in obj.skills)
-            
-            # If either user has no skills, return 0
-            if not current_skills or not target_skills:
-                return 0
-            
-            # Calculate Jaccard similarity (intersection / union)
-            intersection = len(current_skills & target_skills)
-            union = len(current_skills | target_skills)
-            
-            if union == 0:
-                return 0
-            
-            # Return as percentage (0-100)
-            return round((intersection / union) * 100)
-        
-        except Exception:
+        except Profile.DoesNotExist:
             return 0
+        
+        # Same scorer as the batch the network views compute
+        return BatchScorer(current_profile).skill_percentages([obj])[0]
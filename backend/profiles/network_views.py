@@ -4,8 +4,53 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q
 from django.core.paginator import Paginator, EmptyPage
-from .models import Profile
+from connectx_backend.pagination import KeysetPaginator, approximate_count
+from .models import Profile, ProfileSkill, Skill
 from .network_serializers import NetworkUserSerializer
+from .search import get_search_backend
+from .presence import PresenceService
+from connections.services import ConnectionService
+from matching.scoring import BatchScorer
+
+
+def page_match_scores(user, profiles):
+    """Skill match score (0-100) of every profile on the page against user, in one batch"""
+    try:
+        user_profile = Profile.objects.prefetch_related('profile_skills').get(user=user)
+    except Profile.DoesNotExist:
+        return {profile.user_id: 0 for profile in profiles}
+    
+    scores = BatchScorer(user_profile).skill_percentages(profiles)
+    return {profile.user_id: score for profile, score in zip(profiles, scores)}
+
+
+def cursor_page(request, queryset, limit, ordering=('-updated_at', '-id')):
+    """
+    Keyset page over (updated_at, id) for infinite-scroll clients.
+    Returns (profiles, pagination) and never runs COUNT(*) unless an
+    approximate total is requested.
+    """
+    paginator = KeysetPaginator(ordering, limit)
+    page = paginator.paginate(queryset, request.GET.get('cursor') or None)
+    
+    pagination = {
+        'limit': limit,
+        'next': page.next_cursor,
+        'prev': page.prev_cursor,
+        'hasNext': page.has_next,
+        'hasPrev': page.has_prev,
+    }
+    if request.GET.get('approx_total', 'false').lower() == 'true':
+        pagination['total'] = approximate_count(queryset)
+    
+    return page.items, pagination
+
+
+def has_skill(skill):
+    """Q matching profiles that have the given skill (index lookup on the canonical name)"""
+    return Q(id__in=ProfileSkill.objects.filter(
+        skill__name=Skill.canonical_name(skill)
+    ).values('profile_id'))
 
 
 @api_view(['GET'])
@@ -24,21 +69,19 @@ def discover_users(request):
     - page: Page number (default: 1)
     - limit: Results per page (default: 20)
     - match_score: Include match score calculation (default: false)
+    - cursor: Opt into cursor pagination; empty for the first page, then
+      the next/prev token from the previous response
+    - approx_total: With cursor, include an estimated total (default: false)
     """
     try:
         # Start with all profiles except current user
-        queryset = Profile.objects.exclude(user=request.user).select_related('user')
+        queryset = Profile.objects.exclude(user=request.user).select_related('user').prefetch_related('profile_skills')
         
         # Apply filters
         search_query = request.GET.get('search', '').strip()
         if search_query:
-            # Search by name OR skills (case-insensitive)
-            queryset = queryset.filter(
-                Q(first_name__icontains=search_query) |
-                Q(last_name__icontains=search_query) |
-                Q(headline__icontains=search_query) |
-                Q(skills__icontains=[search_query])  # PostgreSQL array contains
-            )
+            # Search by name, headline or skills through the search index
+            queryset = get_search_backend().filter(queryset, search_query)
         
         # Filter by location
         location = request.GET.get('location', '').strip()
@@ -50,7 +93,7 @@ def discover_users(request):
         if skills_param:
             skills_list = [s.strip() for s in skills_param.split(',') if s.strip()]
             for skill in skills_list:
-                queryset = queryset.filter(skills__icontains=[skill])
+                queryset = queryset.filter(has_skill(skill))
         
         # Filter by role/headline
         role = request.GET.get('role', '').strip()
@@ -67,49 +110,68 @@ def discover_users(request):
         # Limit max results per page to prevent abuse
         limit = min(limit, 100)
         
-        paginator = Paginator(queryset, limit)
-        
-        try:
-            page_obj = paginator.page(page)
-        except EmptyPage:
-            # Return empty results for out-of-range pages
-            return Response({
-                'success': True,
-                'data': [],
-                'pagination': {
-                    'page': page,
-                    'limit': limit,
-                    'total': paginator.count,
-                    'pages': paginator.num_pages,
-                    'hasNext': False,
-                    'hasPrev': False,
-                }
-            })
+        if 'cursor' in request.GET:
+            profiles, pagination = cursor_page(request, queryset, limit)
+        else:
+            paginator = Paginator(queryset, limit)
+            
+            try:
+                page_obj = paginator.page(page)
+            except EmptyPage:
+                # Return empty results for out-of-range pages
+                return Response({
+                    'success': True,
+                    'data': [],
+                    'pagination': {
+                        'page': page,
+                        'limit': limit,
+                        'total': paginator.count,
+                        'pages': paginator.num_pages,
+                        'hasNext': False,
+                        'hasPrev': False,
+                    }
+                })
+            
+            profiles = list(page_obj.object_list)
+            pagination = {
+                'page': page,
+                'limit': limit,
+                'total': paginator.count,
+                'pages': paginator.num_pages,
+                'hasNext': page_obj.has_next(),
+                'hasPrev': page_obj.has_previous(),
+            }
         
         # Check if match score should be included
         include_match_score = request.GET.get('match_score', 'false').lower() == 'true'
         
+        # Load connection statuses for the whole page in one query
+        connection_statuses = ConnectionService.get_status_map(
+            request.user, [profile.user_id for profile in profiles]
+        )
+        
+        # Score the page against the requester's skills once
+        match_scores = page_match_scores(request.user, profiles) if include_match_score else None
+        
+        online = PresenceService.online_map([profile.user_id for profile in profiles])
+        
         # Serialize users
         serializer = NetworkUserSerializer(
-            page_obj.object_list,
+            profiles,
             many=True,
             context={
                 'request': request,
-                'include_match_score': include_match_score
+                'include_match_score': include_match_score,
+                'connection_statuses': connection_statuses,
+                'match_scores': match_scores,
+                'online': online,
             }
         )
         
         return Response({
             'success': True,
             'data': serializer.data,
-            'pagination': {
-                'page': page,
-                'limit': limit,
-                'total': paginator.count,
-                'pages': paginator.num_pages,
-                'hasNext': page_obj.has_next(),
-                'hasPrev': page_obj.has_previous(),
-            }
+            'pagination': pagination
         })
     
     except ValueError as e:
@@ -136,12 +198,14 @@ def search_users(request):
     """
     GET /api/network/search
     
-    Search users by name or skills
+    Search users by name, headline or skills, ranked by relevance
     
     Query params:
     - query: Search term (required)
     - page: Page number (default: 1)
     - limit: Results per page (default: 20)
+    - cursor: Opt into cursor pagination (see discover_users)
+    - approx_total: With cursor, include an estimated total (default: false)
     """
     try:
         query = request.GET.get('query', '').strip()
@@ -155,53 +219,76 @@ def search_users(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Search by name OR skills (case-insensitive)
-        queryset = Profile.objects.exclude(user=request.user).filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(headline__icontains=query) |
-            Q(skills__icontains=[query])
-        ).select_related('user').order_by('-updated_at')
+        # Full-text search (ties broken by most recently updated)
+        ordering = ('-search_rank', '-updated_at', '-id')
+        queryset = get_search_backend().filter(
+            Profile.objects.exclude(user=request.user),
+            query
+        ).select_related('user').prefetch_related('profile_skills').order_by(*ordering)
         
         # Pagination
         page = int(request.GET.get('page', 1))
         limit = int(request.GET.get('limit', 20))
         limit = min(limit, 100)
         
-        paginator = Paginator(queryset, limit)
-        
-        try:
-            page_obj = paginator.page(page)
-        except EmptyPage:
-            return Response({
-                'success': True,
-                'data': [],
-                'pagination': {
-                    'page': page,
-                    'limit': limit,
-                    'total': 0,
-                    'pages': 0,
-                }
-            })
+        if 'cursor' in request.GET:
+            profiles, pagination = cursor_page(request, queryset, limit, ordering)
+        else:
+            paginator = Paginator(queryset, limit)
+            
+            try:
+                page_obj = paginator.page(page)
+            except EmptyPage:
+                return Response({
+                    'success': True,
+                    'data': [],
+                    'pagination': {
+                        'page': page,
+                        'limit': limit,
+                        'total': 0,
+                        'pages': 0,
+                    }
+                })
+            
+            profiles = list(page_obj.object_list)
+            pagination = {
+                'page': page,
+                'limit': limit,
+                'total': paginator.count,
+                'pages': paginator.num_pages,
+            }
+        
+        # Load connection statuses for the whole page in one query
+        connection_statuses = ConnectionService.get_status_map(
+            request.user, [profile.user_id for profile in profiles]
+        )
+        online = PresenceService.online_map([profile.user_id for profile in profiles])
         
         # Serialize users
         serializer = NetworkUserSerializer(
-            page_obj.object_list,
+            profiles,
             many=True,
-            context={'request': request}
+            context={
+                'request': request,
+                'connection_statuses': connection_statuses,
+                'online': online,
+            }
         )
         
         return Response({
             'success': True,
             'data': serializer.data,
-            'pagination': {
-                'page': page,
-                'limit': limit,
-                'total': paginator.count,
-                'pages': paginator.num_pages,
-            }
+            'pagination': pagination
         })
     
+    except ValueError as e:
+        return Response(
+            {
+                'success': False,
+                'message': f'Invalid pagination parameters: {str(e)}'
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
     except Exception as e:
         return Response(
             {
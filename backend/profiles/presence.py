@@ -0,0 +1,58 @@
+"""
+Online presence, kept in the cache instead of Profile.is_online.
+
+Each user has a counter of open WebSocket connections that expires after
+PRESENCE_TIMEOUT seconds unless a heartbeat refreshes it, so a worker that
+dies without running disconnect can only leave a user "online" for one
+timeout. Connects, heartbeats and disconnects never write to the database.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+
+class PresenceService:
+    @staticmethod
+    def _key(user_id):
+        return f'presence:{user_id}'
+    
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'PRESENCE_TIMEOUT', 90)
+    
+    @staticmethod
+    def connect(user_id):
+        key = PresenceService._key(user_id)
+        timeout = PresenceService._timeout()
+        cache.add(key, 0, timeout)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            cache.add(key, 1, timeout)
+        cache.touch(key, timeout)
+    
+    @staticmethod
+    def heartbeat(user_id):
+        if not cache.touch(PresenceService._key(user_id), PresenceService._timeout()):
+            # The counter expired while this socket stayed open
+            cache.add(PresenceService._key(user_id), 1, PresenceService._timeout())
+    
+    @staticmethod
+    def disconnect(user_id):
+        key = PresenceService._key(user_id)
+        try:
+            if cache.decr(key) <= 0:
+                cache.delete(key)
+        except ValueError:
+            pass
+    
+    @staticmethod
+    def is_online(user_id):
+        return bool(cache.get(PresenceService._key(user_id)))
+    
+    @staticmethod
+    def online_map(user_ids):
+        """{user_id: bool} for a batch of users in one cache round trip"""
+        keys = {PresenceService._key(user_id): user_id for user_id in user_ids}
+        found = cache.get_many(keys.keys())
+        return {user_id: bool(found.get(key)) for key, user_id in keys.items()}
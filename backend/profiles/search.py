@@ -0,0 +1,202 @@
+"""
+People search backends.
+
+On PostgreSQL profiles are matched with a prefix full-text query on
+Profile.search_document (GIN tsvector index) OR, when pg_trgm is
+installed, trigram word similarity (GIN trigram index) for typos, and
+ranked by ts_rank + similarity. Other
+databases (SQLite in development) use an in-process inverted index kept
+up to date from Profile saves.
+
+Both backends annotate matching rows with `search_rank`.
+"""
+import bisect
+import re
+import threading
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+from .models import Profile
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def no_results(queryset):
+    """Empty result that still carries the search_rank annotation"""
+    return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class PostgresProfileSearch:
+    """Full-text search with trigram fallback, served from GIN indexes"""
+    
+    CONFIG = 'simple'
+    
+    def __init__(self):
+        self._trigram = None
+    
+    @property
+    def trigram(self):
+        """Whether the pg_trgm extension is installed"""
+        if self._trigram is None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                self._trigram = cursor.fetchone() is not None
+        return self._trigram
+    
+    def update_profile(self, profile_id, document):
+        """Nothing to do: the indexes are maintained by PostgreSQL"""
+    
+    def remove_profile(self, profile_id):
+        """Nothing to do: the indexes are maintained by PostgreSQL"""
+    
+    def filter(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return no_results(queryset)
+        
+        # Prefix match on every word: "jo dev" -> jo:* & dev:*
+        tsquery = SearchQuery(' & '.join(f'{token}:*' for token in tokens), config=self.CONFIG, search_type='raw')
+        vector = SearchVector('search_document', config=self.CONFIG)
+        
+        # ts_rank/similarity are float4; rank as float8 so cursor keys round-trip exactly
+        if not self.trigram:
+            return queryset.annotate(
+                search=vector,
+                search_rank=Cast(SearchRank(vector, tsquery), FloatField()),
+            ).filter(search=tsquery)
+        
+        return queryset.annotate(
+            search=vector,
+            search_rank=Cast(
+                SearchRank(vector, tsquery) + TrigramWordSimilarity(query, 'search_document'),
+                FloatField()
+            ),
+        ).filter(
+            Q(search=tsquery) | Q(search_document__trigram_word_similar=query)
+        )
+
+
+class InMemoryProfileSearch:
+    """
+    Pure-Python inverted index (token -> profile ids) for databases
+    without full-text search. Built lazily on first use.
+    """
+    
+    # Cap on ranked ids pushed back into SQL
+    MAX_RESULTS = 1000
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._documents = {}
+        self._sorted_tokens = []
+        self._dirty = False
+    
+    def _build(self):
+        self._postings = {}
+        self._documents = {}
+        for profile_id, document in Profile.objects.values_list('id', 'search_document').iterator():
+            self._add(profile_id, document)
+        self._dirty = True
+    
+    def _add(self, profile_id, document):
+        tokens = set(tokenize(document))
+        self._documents[profile_id] = tokens
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(profile_id)
+    
+    def _remove(self, profile_id):
+        for token in self._documents.pop(profile_id, ()):
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(profile_id)
+                if not ids:
+                    del self._postings[token]
+    
+    def update_profile(self, profile_id, document):
+        with self._lock:
+            if self._postings is None:
+                return
+            self._remove(profile_id)
+            self._add(profile_id, document)
+            self._dirty = True
+    
+    def remove_profile(self, profile_id):
+        with self._lock:
+            if self._postings is None:
+                return
+            self._remove(profile_id)
+            self._dirty = True
+    
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            yield token
+    
+    def scores(self, query):
+        """{profile_id: score} for profiles matching every query word (exact 1.0, prefix 0.5)"""
+        with self._lock:
+            if self._postings is None:
+                self._build()
+            if self._dirty:
+                self._sorted_tokens = sorted(self._postings)
+                self._dirty = False
+            
+            result = None
+            for word in tokenize(query):
+                word_scores = {}
+                for token in self._prefix_matches(word):
+                    weight = 1.0 if token == word else 0.5
+                    for profile_id in self._postings[token]:
+                        if word_scores.get(profile_id, 0) < weight:
+                            word_scores[profile_id] = weight
+                
+                if result is None:
+                    result = word_scores
+                else:
+                    result = {
+                        profile_id: score + word_scores[profile_id]
+                        for profile_id, score in result.items()
+                        if profile_id in word_scores
+                    }
+            
+            return result or {}
+    
+    def filter(self, queryset, query):
+        scores = self.scores(query)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:self.MAX_RESULTS]
+        if not ranked:
+            return no_results(queryset)
+        
+        return queryset.filter(id__in=[profile_id for profile_id, _ in ranked]).annotate(
+            search_rank=Case(
+                *[When(id=profile_id, then=Value(score)) for profile_id, score in ranked],
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+
+
+_backend = None
+
+
+def get_search_backend():
+    """Search backend for the default database"""
+    global _backend
+    
+    if _backend is None:
+        if connection.vendor == 'postgresql':
+            _backend = PostgresProfileSearch()
+        else:
+            _backend = InMemoryProfileSearch()
+    
+    return _backend
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Profile
-from connections.models import ConnectionRequest
+from connections.services import ConnectionGraph
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -50,40 +50,36 @@ class ProfileSerializer(serializers.ModelSerializer):
         """Returns full name or falls back to first name from email"""
         return obj.name
     
+    def _get_adjacency(self, obj):
+        """Accepted-connection adjacency, from the view's prefetched graph when available"""
+        graph = self.context.get('connection_graph')
+        if graph is not None and obj.user_id in graph:
+            return graph[obj.user_id]
+        return ConnectionGraph.get(obj.user_id)
+    
     def get_connections(self, obj):
         """Returns array of accepted connection user IDs"""
-        user = obj.user
-        # Get accepted connections where user is sender or receiver
-        sent_accepted = ConnectionRequest.objects.filter(
-            sender=user, status='accepted'
-        ).values_list('receiver_id', flat=True)
-        
-        received_accepted = ConnectionRequest.objects.filter(
-            receiver=user, status='accepted'
-        ).values_list('sender_id', flat=True)
-        
-        # Combine and return as list
-        return list(set(list(sent_accepted) + list(received_accepted)))
+        return ConnectionGraph.connections(self._get_adjacency(obj))
     
     def get_followers(self, obj):
         """Returns array of follower user IDs (people who sent them connection requests)"""
-        user = obj.user
         # For now, treating accepted connections as followers/following
         # Could be extended with a separate Follow model
-        followers = ConnectionRequest.objects.filter(
-            receiver=user, status='accepted'
-        ).values_list('sender_id', flat=True)
-        
-        return list(followers)
+        return list(self._get_adjacency(obj)['followers'])
     
     def get_following(self, obj):
         """Returns array of following user IDs (people they sent requests to)"""
-        user = obj.user
-        following = ConnectionRequest.objects.filter(
-            sender=user, status='accepted'
-        ).values_list('receiver_id', flat=True)
-        
-        return list(following)
+        return list(self._get_adjacency(obj)['following'])
+
+
+class SkillListField(serializers.ListField):
+    """List of skill labels; a comma-separated string is accepted too"""
+    child = serializers.CharField(allow_blank=True)
+    
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = data.split(',')
+        return super().to_internal_value(data)
 
 
 class ProfileUpdateSerializer(serializers.ModelSerializer):
@@ -93,6 +89,7 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
     """
     # Accept 'name' from frontend and split into first/last
     name = serializers.CharField(write_only=True, required=False)
+    skills = SkillListField(required=False)
     
     class Meta:
         model = Profile
@@ -118,6 +115,11 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
                 instance.first_name = parts[0]
                 instance.last_name = parts[1] if len(parts) > 1 else ''
         
+        # Skills live in the Skill table; set them before save() so
+        # post_save receivers see the new list
+        if 'skills' in validated_data:
+            instance.set_skills(validated_data.pop('skills'))
+        
         # Update remaining fields
         for field, value in validated_data.items():
             setattr(instance, field, value)
@@ -1,7 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from .models import Profile
+from .search import get_search_backend
 
 User = get_user_model()
 
@@ -16,3 +17,13 @@ def create_user_profile(sender, instance, created, **kwargs):
 def save_user_profile(sender, instance, **kwargs):
     if hasattr(instance, 'profile'):
         instance.profile.save()
+
+
+@receiver(post_save, sender=Profile)
+def update_search_index(sender, instance, **kwargs):
+    get_search_backend().update_profile(instance.id, instance.search_document)
+
+
+@receiver(post_delete, sender=Profile)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove_profile(instance.id)
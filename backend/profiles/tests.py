@@ -0,0 +1,88 @@
+from unittest import skipUnless
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient, APIRequestFactory
+from connections.models import ConnectionRequest
+from .models import Profile
+from .network_serializers import NetworkUserSerializer
+from .network_views import page_match_scores
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs PostgreSQL (connectx_backend.test_settings)')
+class NetworkPageQueryCountTests(TestCase):
+    """The network page costs the same number of queries however many cards it shows"""
+
+    # COUNT, page of profiles, their skills, connection statuses
+    PAGE_QUERIES = 4
+    # No COUNT with cursor pagination
+    CURSOR_QUERIES = 3
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='me@example.com', username='me', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def build_network(self, n):
+        """n other users, cycling through every connection state in both directions"""
+        for i in range(n):
+            other = User.objects.create_user(email=f'user{i}@example.com', username=f'user{i}', password='x')
+            other.profile.set_skills(['Python', 'React'][:i % 3])
+            other.profile.save()
+
+            state = i % 5
+            if state == 0:
+                continue
+            status = ['pending', 'accepted', 'rejected', 'accepted'][state - 1]
+            if state % 2:
+                ConnectionRequest.objects.create(sender=self.user, receiver=other, status=status)
+            else:
+                ConnectionRequest.objects.create(sender=other, receiver=self.user, status=status)
+
+    def assert_page_queries(self, n, queries, params=''):
+        self.build_network(n)
+        with self.assertNumQueries(queries):
+            response = self.client.get(f'/api/profile/network/?limit=100{params}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), n)
+        return response.data['data']
+
+    def test_small_page(self):
+        self.assert_page_queries(3, self.PAGE_QUERIES)
+
+    def test_large_page(self):
+        cards = self.assert_page_queries(25, self.PAGE_QUERIES)
+        statuses = {card['connectionStatus'] for card in cards}
+        self.assertEqual(statuses, {'not_connected', 'pending', 'connected'})
+
+    def test_small_cursor_page(self):
+        self.assert_page_queries(3, self.CURSOR_QUERIES, '&cursor=')
+
+    def test_large_cursor_page(self):
+        self.assert_page_queries(25, self.CURSOR_QUERIES, '&cursor=')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs PostgreSQL (connectx_backend.test_settings)')
+class MatchScoreTests(TestCase):
+    def test_serializer_fallback_matches_batch(self):
+        me = User.objects.create_user(email='me@example.com', username='me', password='x')
+        me.profile.set_skills(['Python', 'react ', 'SQL'])
+        me.profile.save()
+        for i, skills in enumerate([[], ['python'], ['PYTHON', 'Go'], ['sql', 'React', 'python'], ['Rust']]):
+            other = User.objects.create_user(email=f'user{i}@example.com', username=f'user{i}', password='x')
+            other.profile.set_skills(skills)
+            other.profile.save()
+
+        request = APIRequestFactory().get('/')
+        request.user = me
+        profiles = list(Profile.objects.exclude(user=me).prefetch_related('profile_skills'))
+        batch = page_match_scores(me, profiles)
+        context = {'request': request, 'include_match_score': True, 'connection_statuses': {}}
+        single = {
+            profile.user_id: NetworkUserSerializer(profile, context=context).data['matchScore']
+            for profile in profiles
+        }
+        self.assertEqual(single, batch)
+        self.assertEqual(sorted(batch.values()), [0, 0, 25, 33, 100])